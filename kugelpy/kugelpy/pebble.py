@@ -4,25 +4,92 @@
 Copyright 2024, Battelle Energy Alliance, LLC, ALL RIGHTS RESERVED
 '''
 
-import numpy as np
+import bisect
+import functools
 import math
+import numpy as np
+import sys
+from types import MappingProxyType
+
+## (float) Constant factor in the volume of a sphere, 4/3 pi, shared by every volume calculation.
+_VOL_COEF = math.pi * 4 / 3
+## (dict) Interned mesh location strings keyed by (channel, volume), so pebbles in the same mesh cell share one string object.
+_MESH_CACHE = {}
+
+def _format_mesh_location(channel, volume):
+    """!
+    Combination of channel and volume numbers used to identify the general position of a pebble in the core.
+    """
+    mesh_location = _MESH_CACHE.get((channel, volume))
+    if mesh_location is None:
+        mesh_location = _MESH_CACHE.setdefault((channel, volume), sys.intern(f'c{channel}v{volume}'))
+    return mesh_location
+
+@functools.lru_cache(maxsize=65536)
+def _build_universe(shuffled, previous_universe, mesh_location, prefix):
+    """!
+    Universe name of a pebble at `mesh_location`. \n
+    If the pebble has been shuffled the mesh location is appended to the previous universe, otherwise the leading group token of the previous universe is replaced by `prefix`. \n
+    Pebbles sharing a previous universe and mesh location produce the same name, so results are cached.
+    """
+    if shuffled:
+        return previous_universe + '_' + mesh_location
+    # Keep everything between the leading group token and the trailing mesh location of the previous universe
+    head, sep, _ = previous_universe.rpartition('_')
+    first_sep = head.find('_')
+    if not sep:
+        univ = '_'
+    elif first_sep < 0:
+        univ = ''
+    else:
+        univ = head[first_sep + 1:] + '_'
+    return prefix + univ + mesh_location
 
 class Pebble(object):
     """!
     Class for holding information for an individual pebble.
     """
 
-    def __init__(self, x, y, z, r, radius, channel, volume, temperature=900.0, pass_limit=6, pebble_number=0):
+    # Pebbles are created by the hundreds of thousands, so the attributes are slotted rather than stored in a per-instance `__dict__`.
+    __slots__ = ('_pebble_type', '_inner_radius', '_radius', '_material', '_owns_material', '_x', '_y', '_z', '_r', '_volume_num', '_channel_num',
+                 '_mesh_location', '_temperature', '_shuffled', '_previous_universe', '_burnup', '_burnup_j_cm3', '_num_passes',
+                 '_pass_limit', '_pebble_number', '_universe', '_xs_bin', '_geometry')
+
+    ## (float) Inner radius of a pebble surrounding the graphite matrix [cm], shared by `__init__()` and `from_arrays()`.
+    INNER_RADIUS = 2.5
+
+    ## (dict) Read-only table of temperature-dependent cross section data labels shared by all pebbles, stored in the form {temp1: (xs_set, graphite), temp2: (xs_set, graphite), ...}
+    ## The labels are interned so every pebble references the same string objects.
+    _XS_TABLE = MappingProxyType({temp: tuple(sys.intern(label) for label in labels) for temp, labels in
+                                 {1500: ('15c', 'grph1500'),
+                                  1200: ('12c', 'grph1200'),
+                                   900: ('09c',  'grph900'),
+                                   600: ('06c',  'grph600'),
+                                   300: ('03c',  'grph300'),}.items()})
+    ## (tuple) Sorted temperatures (keys of `_XS_TABLE`) used to bin a pebble temperature into a cross-section set.
+    _XS_KEYS_SORTED = tuple(sorted(_XS_TABLE))
+    ## (tuple) Entries of `_XS_TABLE` indexed by temperature bin (position in `_XS_KEYS_SORTED`).
+    _XS_TABLE_BY_BIN = tuple(map(_XS_TABLE.__getitem__, _XS_KEYS_SORTED))
+    ## (tuple) Exclusive upper temperature of each bin in `_XS_KEYS_SORTED` (the last bin is open-ended).
+    _XS_BIN_UPPER = _XS_KEYS_SORTED[1:] + (math.inf,)
+    ## (dict) Default materials shared by every pebble until its material is updated \n
+    ## Must not be modified in place; `update_fuel_material()` copies it before the first change (see `_owns_material`).
+    _DEFAULT_MATERIAL = {'matrix':   {'6000': 9.22570E-2, '5010': 2.28336E-9, '5011': 9.24876E-9},
+                         'pebshell': {'6000': 6.61814E-2, '5010': 2.23273E-8,  '5011': 9.04368E-7}}
+
+    def __init__(self, x, y, z, r, radius, channel, volume, temperature=900.0, pass_limit=6, pebble_number=0, _finalize=True):
         ## (str, default: 'graphite') Designation if this is a graphite or fuel pebble.
         self._pebble_type = 'graphite'
-        ## (float, default: 2.5) Inner radius of the pebble surrounding the graphite matrix [cm].
-        self._inner_radius = 2.5
+        ## (float, default: INNER_RADIUS) Inner radius of the pebble surrounding the graphite matrix [cm].
+        self._inner_radius = self.INNER_RADIUS
         ## (float, default: radius) Radius of the pebble.
         self._radius = radius
         ##  (float, default: ) Dictionary of the materials in the pebble \n
         ## Takes the form: {'material_name': {'ZAID1': float, 'ZAID2': float, ...}}.
-        self._material = {'matrix':   {'6000': 9.22570E-2, '5010': 2.28336E-9, '5011': 9.24876E-9},
-                         'pebshell': {'6000': 6.61814E-2, '5010': 2.23273E-8,  '5011': 9.04368E-7}}
+        self._material = self._DEFAULT_MATERIAL
+        ## (bool, default: False) True once `_material` is a dictionary owned by this pebble \n
+        ## Pebbles sharing a material (the class default, or one dictionary after a save/load round trip) copy it before their first change.
+        self._owns_material = False
         ## (float, default: x) Current x coordinate of pebble in the pebble bed.
         self._x = x
         ## (float, default: y) Current y coordinate of pebble in the pebble bed.
@@ -35,8 +102,9 @@ class Pebble(object):
         self._volume_num = volume
         ## (int, default: channel) Integer representation (index) of the channel the pebble is in.
         self._channel_num = channel
-        ## (str, default: f'c{channel}v{volume}') Combination of channel and volume numbers used to identify general position of pebble in core.
-        self._mesh_location = f'c{channel}v{volume}'
+        ## (str, default: f'c{channel}v{volume}') Combination of channel and volume numbers used to identify general position of pebble in core \n
+        ## The string is interned, so pebbles in the same mesh cell share it (see `mesh_location` for the (channel, volume) form).
+        self._mesh_location = _format_mesh_location(channel, volume)
         ## (str, default: temperature) Temperature of the pebble in Kelvin (assumes constant temperature over whole pebble).
         self._temperature = temperature
         ## (bool, default: False) Indicator if this is the first pass or Nth pass through the core.
@@ -54,25 +122,91 @@ class Pebble(object):
         self._pass_limit = pass_limit
         ## (int, default: pebble_number) Integer related to the pebble number in the core.
         self._pebble_number = pebble_number
-        ## (dict, default: ) Dictionary containing temperature-dependent cross section data labels stored in the form {temp1:{'graphite':_, 'xs_set':_}, temp2:{'graphite':_, 'xs_set':_}, ...}
-        self._xs_dict = {1500: {'graphite': 'grph1500', 'xs_set': '15c'},
-                        1200: {'graphite': 'grph1200', 'xs_set': '12c'},
-                         900: {'graphite':  'grph900', 'xs_set': '09c'},
-                         600: {'graphite':  'grph600', 'xs_set': '06c'},
-                         300: {'graphite':  'grph300', 'xs_set': '03c'},}
-        ## (str, default: 'g0_' + self.mesh_location) Tracks previous universe of pebble.
-        self._previous_universe = 'g0_' + self._mesh_location
+        # Subclasses pass _finalize=False and set the universe, cross sections and geometry themselves once their own data is in place
+        if _finalize:
+            ## (str, default: 'g0_' + self._mesh_location) Tracks previous universe of pebble.
+            self._previous_universe = 'g0_' + self._mesh_location
 
-        self.set_universe()
-        
-        ## (dict, default: self.set_xs_set(self.temperature)) Cross-section set and scattering library based on the temperature.
-        self._xs_library, self._scattering_library = self.set_xs_set(self._temperature)
-        ## (dict, default: ) Dictionary of the geometry in the pebble \n
-        ## Each entry describes a part of the geometry, where a given radius and number of instances are used to calculate the volume \n 
-        ## Takes the form: {'geometry_name': {'radius': float, 'number_of_instances': int, 'volume': float}}.
-        self._geometry = {'matrix':    {'radius': self._inner_radius,    'number_of_instance': 1, 'volume': 0.0},
-                         'pebshell':  {'radius': radius, 'number_of_instance': 1, 'volume': 0.0}}
-        self.calculate_volumes()
+            self.set_universe()
+
+            ## (int, default: self._bin_temperature(self.temperature)) Temperature bin of the cross-section set and scattering library (see `xs_library` and `scattering_library`).
+            self._xs_bin = self._bin_temperature(self._temperature)
+            ## (dict, default: ) Dictionary of the geometry in the pebble \n
+            ## Each entry describes a part of the geometry, where a given radius and number of instances are used to calculate the volume \n 
+            ## Takes the form: {'geometry_name': {'radius': float, 'number_of_instances': int, 'volume': float}}.
+            self._geometry = {'matrix':    {'radius': self._inner_radius,    'number_of_instance': 1, 'volume': 0.0},
+                             'pebshell':  {'radius': radius, 'number_of_instance': 1, 'volume': 0.0}}
+            self.calculate_volumes()
+
+    @classmethod
+    def from_arrays(cls, x, y, z, r, radius, channel, volume, temperature=900.0, pass_limit=6, pebble_number=0):
+        """!
+        Build a list of graphite pebbles from per-pebble arrays (scalars are broadcast to every pebble). \n
+        Equivalent to calling `Pebble(...)` for each pebble, but the mesh locations, universes, cross-section sets and volumes are computed once per unique value.
+        """
+        if cls is not Pebble:
+            raise TypeError(f'from_arrays only builds graphite pebbles, not {cls.__name__}')
+        columns = np.broadcast_arrays(*(np.asarray(arr) for arr in (x, y, z, r, radius, channel, volume, temperature, pass_limit, pebble_number)))
+        x, y, z, r, radius, channel, volume, temperature, pass_limit, pebble_number = (np.atleast_1d(arr).tolist() for arr in columns)
+
+        xs_bins = {temp: cls._bin_temperature(temp) for temp in set(temperature)}
+        matrix_volume = _VOL_COEF * math.pow(cls.INNER_RADIUS, 3)
+        volumes = {rad: (matrix_volume, _VOL_COEF * math.pow(rad, 3) - matrix_volume) for rad in set(radius)}
+
+        pebbles = [None] * len(x)
+        for idx in range(len(x)):
+            pebble = object.__new__(cls)
+            mesh_location = _format_mesh_location(channel[idx], volume[idx])
+            pebble._pebble_type = 'graphite'
+            pebble._inner_radius = cls.INNER_RADIUS
+            pebble._radius = radius[idx]
+            pebble._material = cls._DEFAULT_MATERIAL
+            pebble._owns_material = False
+            pebble._x = x[idx]
+            pebble._y = y[idx]
+            pebble._z = z[idx]
+            pebble._r = r[idx]
+            pebble._volume_num = volume[idx]
+            pebble._channel_num = channel[idx]
+            pebble._mesh_location = mesh_location
+            pebble._temperature = temperature[idx]
+            pebble._shuffled = False
+            pebble._previous_universe = 'g0_' + mesh_location
+            pebble._burnup = 0.
+            pebble._burnup_j_cm3 = 0.
+            pebble._num_passes = 0
+            pebble._pass_limit = pass_limit[idx]
+            pebble._pebble_number = pebble_number[idx]
+            pebble._universe = _build_universe(False, pebble._previous_universe, mesh_location, 'g_')
+            pebble._xs_bin = xs_bins[temperature[idx]]
+            matrix_volume, pebshell_volume = volumes[radius[idx]]
+            pebble._geometry = {'matrix':   {'radius': cls.INNER_RADIUS, 'number_of_instance': 1, 'volume': matrix_volume},
+                                'pebshell': {'radius': radius[idx],      'number_of_instance': 1, 'volume': pebshell_volume}}
+            pebbles[idx] = pebble
+        return pebbles
+
+    def __setstate__(self, state):
+        """!
+        Restore a pickled pebble, including save points written before pebbles were slotted. \n
+        Those store the instance `__dict__`, with the cross-section labels instead of their temperature bins.
+        """
+        dict_state, slot_state = state if isinstance(state, tuple) else (state, None)
+        state = {**(dict_state or {}), **(slot_state or {})}
+        state['_mesh_location'] = _format_mesh_location(state['_channel_num'], state['_volume_num'])
+        if '_xs_library' in state:
+            state.pop('_xs_dict', None)
+            state.setdefault('_burnup_j_cm3', 0.)
+            # Each pebble had its own material dictionary, but the pickle may still share it between pebbles
+            state.setdefault('_owns_material', False)
+            xs_bins = {labels[0]: xs_bin for xs_bin, labels in enumerate(self._XS_TABLE_BY_BIN)}
+            state['_xs_bin'] = xs_bins[state.pop('_xs_library')]
+            state.pop('_scattering_library', None)
+            if '_xs_fuel_library' in state:
+                state['_fuel_xs_bin'] = xs_bins[state.pop('_xs_fuel_library')]
+                state.pop('_fuel_scattering_library', None)
+                state.setdefault('_bu_jcm3_factor', 1E6 * FuelPebble.SECONDS_PER_DAY / state['_triso_volume'])
+        for name, value in state.items():
+            setattr(self, name, value)
 
     def calculate_volumes(self):
         """!
@@ -80,18 +214,25 @@ class Pebble(object):
         """
         previous_volume = 0.0
         for data in self._geometry.values():
-            volume = math.pi * 4 / 3 * math.pow(data['radius'], 3) 
-            total_region_volume = volume * data['number_of_instance']
+            total_region_volume = _VOL_COEF * math.pow(data['radius'], 3) * data['number_of_instance']
             data['volume'] = total_region_volume - previous_volume
-            previous_volume = total_region_volume 
+            previous_volume = total_region_volume
+
+    @classmethod
+    def _bin_temperature(cls, temperature):
+        """!
+        Index of the highest cross-section set temperature (in `_XS_KEYS_SORTED`) that does not exceed the temperature
+        """
+        index = bisect.bisect_right(cls._XS_KEYS_SORTED, temperature) - 1
+        if index < 0:
+            raise ValueError(f'Temperature {temperature} K is below the lowest cross-section set temperature ({cls._XS_KEYS_SORTED[0]} K)')
+        return index
 
     def set_xs_set(self, temperature):
         """!
         Grab the correct cross-section set and scattering library based on the temperature
         """
-        dict_array = np.array([x for x in self._xs_dict.keys()])
-        temp = dict_array[dict_array<temperature].max() if temperature not in self._xs_dict.keys() else temperature
-        return self._xs_dict[temp]['xs_set'], self._xs_dict[temp]['graphite']
+        return self._XS_TABLE_BY_BIN[self._bin_temperature(temperature)]
         
     def update_position(self, x, y, z, r, channel, volume, shuffled=False):
         """!
@@ -104,9 +245,30 @@ class Pebble(object):
         self._r = r
         self._channel_num = channel
         self._volume_num = volume
-        self._mesh_location = f'c{channel}v{volume}'
+        self._mesh_location = _format_mesh_location(channel, volume)
         self.set_universe()
 
+    @property
+    def mesh_location(self):
+        """!
+        Mesh location as a (channel, volume) tuple.
+        """
+        return (self._channel_num, self._volume_num)
+
+    @property
+    def xs_library(self):
+        """!
+        Cross-section set for the pebble temperature.
+        """
+        return self._XS_TABLE_BY_BIN[self._xs_bin][0]
+
+    @property
+    def scattering_library(self):
+        """!
+        Graphite scattering library for the pebble temperature.
+        """
+        return self._XS_TABLE_BY_BIN[self._xs_bin][1]
+
     def set_previous_universe(self, prev_universe):
         """!
         Update the previous universe after a shift or refuel
@@ -123,30 +285,46 @@ class Pebble(object):
         """!
         Update the current universe of the pebbble, if this is not the first pass (i.e. it has been shuffled, add the previous universe to the current pebble location
         """
-        if self._shuffled:
-            self._universe = self._previous_universe + '_' + self._mesh_location
-        else:
-            split_univ = self._previous_universe.split('_')[1:]
-            univ = '' if len(split_univ) == 1 else '_'.join([x for x in split_univ[:-1]]) + '_'
-            self._universe = f'g_' + univ + self._mesh_location 
-            #self._universe = f'g_' + f'p{self._num_passes}_' + f'bu{self._burnup_group}_ + univ + self._mesh_location
+        self._universe = _build_universe(self._shuffled, self._previous_universe, self._mesh_location, 'g_')
+        #self._universe = f'g_' + f'p{self._num_passes}_' + f'bu{self._burnup_group}_ + univ + self._mesh_location
     
     def update_pebble_temperature(self,pebble_temp,fuel_temp=None):
         """!
         Update the pebble temperature and corresponding cross-section/scattering libraries.
         """
         self._temperature = pebble_temp
-        self._xs_library, self._scattering_library = self.set_xs_set(pebble_temp)
+        self._xs_bin = self._bin_temperature(pebble_temp)
 
 class FuelPebble(Pebble):
     """!
     Class for holding information for an individual pebble.
     """
+
+    __slots__ = ('_homogenization_group', '_kernel_data', '_kernels_per_pebble', '_fuel_temperature', '_triso_volume',
+                 '_bu_jcm3_factor', '_power_days', '_power_density', '_days_in_core', '_fuel_xs_bin')
+
+    ## (float) Mass of heavy metal originally in a fuel pebble [kg].
+    FUEL_KG_PER_PEBBLE = 0.007
+    ## (float) Number of seconds in a day.
+    SECONDS_PER_DAY = 86400.
+    ## (float) Converts power days [MWd] to burnup [MWd/kg].
+    _BU_MWD_FACTOR = 1. / FUEL_KG_PER_PEBBLE
+
+    ## (dict) Default fuel pebble materials shared by every fuel pebble until its fuel material is updated \n
+    ## Contains 'fuel', 'buffer', 'inner_pyc', 'sic', 'outer_pyc', 'martix', and 'pebshell' \n
+    ## Must not be modified in place; `update_fuel_material()` copies it before the first change (see `_owns_material`).
+    _DEFAULT_MATERIAL = {'fuel':      {'92235': 3.70100E-3, '92238': 1.99216E-2,  '8016': 3.37331E-1, '6000': 9.26006E-3, '5010': 1.87091E-8, '5011': 7.57813E-8},
+                         'buffer':    { '6000': 5.26466E-2,  '5010': 1.35512E-8,  '5011': 5.48894E-8},
+                         'inner_pyc': { '6000': 9.52653E-2,  '5010': 2.45213E-8,  '5011': 9.93236E-8},
+                         'sic':       {'14028': 4.43271E-2, '14029': 2.25082E-3, '14030': 1.48376E-3, '6000': 4.80616E-2,  '5010': 1.23711E-8,  '5011': 5.0109E-8},
+                         'outer_pyc': { '6000': 9.52653E-2,  '5010': 2.45213E-8,  '5011': 9.93236E-8},
+                         'matrix':    { '6000': 8.67416E-2,  '5010': 2.23273E-8,  '5011': 9.04368E-8},
+                         'pebshell':  { '6000': 8.67416E-2,  '5010': 2.23273E-8,  '5011': 9.04368E-8}}
     
     def __init__(self, x, y, z, r, radius, channel, volume, fuel_material=None, homogenization_group=0, temperature=900.0,  fuel_temperature=900.0, pass_limit=6, pebble_number=0, kernel_data=None):
         ## (int, default: 0) Index used to indicate which pebbles are homogenized within a volume.
         self._homogenization_group = homogenization_group
-        super().__init__(x, y, z, r, radius, channel, volume, temperature=temperature, pass_limit=pass_limit, pebble_number=pebble_number)
+        super().__init__(x, y, z, r, radius, channel, volume, temperature=temperature, pass_limit=pass_limit, pebble_number=pebble_number, _finalize=False)
         ## (str, default: 'fuel') Designation if this is a graphite or fuel pebble.
         self._pebble_type = 'fuel'
         ## (dict, default: None) Stores geometric information of TRISO particles within pebble matrix region in centimeters \n
@@ -157,16 +335,12 @@ class FuelPebble(Pebble):
         ## (dict, default : ) Dictionary of material compositions for fueled pebbles including all TRISO laters \n
         ## Contains 'fuel', 'buffer', 'inner_pyc', 'sic', 'outer_pyc', 'martix', and 'pebshell' \n
         ## Stored in the form {'material':{'ZAID':atom_density, ...}, ...}.
-        self._material = {'fuel':      {'92235': 3.70100E-3, '92238': 1.99216E-2,  '8016': 3.37331E-1, '6000': 9.26006E-3, '5010': 1.87091E-8, '5011': 7.57813E-8},
-                         'buffer':    { '6000': 5.26466E-2,  '5010': 1.35512E-8,  '5011': 5.48894E-8},
-                         'inner_pyc': { '6000': 9.52653E-2,  '5010': 2.45213E-8,  '5011': 9.93236E-8},
-                         'sic':       {'14028': 4.43271E-2, '14029': 2.25082E-3, '14030': 1.48376E-3, '6000': 4.80616E-2,  '5010': 1.23711E-8,  '5011': 5.0109E-8},
-                         'outer_pyc': { '6000': 9.52653E-2,  '5010': 2.45213E-8,  '5011': 9.93236E-8},
-                         'matrix':    { '6000': 8.67416E-2,  '5010': 2.23273E-8,  '5011': 9.04368E-8},
-                         'pebshell':  { '6000': 8.67416E-2,  '5010': 2.23273E-8,  '5011': 9.04368E-8}}
+        self._material = {**self._DEFAULT_MATERIAL, 'fuel': fuel_material} if fuel_material else self._DEFAULT_MATERIAL
+        ## (bool, default: False) True once `_material` is a dictionary owned by this pebble (see `Pebble._owns_material`).
+        self._owns_material = bool(fuel_material)
         ## (float, default: 900) Averaged fuel kernel temperature in Kelvin.
         self._fuel_temperature = fuel_temperature
-        ## (_previous_universe** : str, default: f'f{self.homogenization_group}_' + self.mesh_location) Concatinated string containing the previous universes the pebble was exposed to \n
+        ## (_previous_universe** : str, default: f'f{self.homogenization_group}_' + self._mesh_location) Concatinated string containing the previous universes the pebble was exposed to \n
         ## If the pebble is homogenized after each pass, we default the previous universes to c0v0.
         self._previous_universe = f'f{self._homogenization_group}_' + self._mesh_location
 
@@ -175,18 +349,19 @@ class FuelPebble(Pebble):
 
         ## (_triso_volume** : float, default: 18687 * 0.0000402) Volume of the fuel kernels in the pebble (required for correct burnup).
         self._triso_volume = self._kernels_per_pebble * 0.0000402
+        ## (float, default: 1E6 * 86400 / self._triso_volume) Converts power days [MWd] to burnup [J/cm3]: MW to J/s (1E6) and days to seconds (86,400 s/day) over the kernel volume.
+        self._bu_jcm3_factor = 1E6 * self.SECONDS_PER_DAY / self._triso_volume
         ## (float, default: 0.) Number of megawatt days the pebbles has been in the core (days * power) [MWd].
         self._power_days = 0.
         ## (float, default: 0.) Current power density for the pebble (this is the power density for all pebbles of the same fuel type, same pass number, and in the same core location) [MW/cm3]
         self._power_density = 0.
         ## (float, default:0) Tracks how long the pebbles has been in-core.
         self._days_in_core = 0
-
-        if fuel_material:
-            self._material['fuel'] = fuel_material
         
-        ## (dict, default: self.set_xs_set(self.lial2_temperature)[0]) Dictinary storing cross sections for the fuel at the current temperature.
-        self._xs_fuel_library, self._fuel_scattering_library = self.set_xs_set(self._fuel_temperature)
+        ## (int, default: self._bin_temperature(self.fuel_temperature)) Temperature bin of the fuel cross sections (see `xs_fuel_library` and `fuel_scattering_library`).
+        self._fuel_xs_bin = self._bin_temperature(self._fuel_temperature)
+        ## (int, default: self._bin_temperature(self.temperature)) Temperature bin of the cross-section set and scattering library (see `xs_library` and `scattering_library`).
+        self._xs_bin = self._bin_temperature(self._temperature)
         ## (dict, default: ) Dictionary containing geometry data for fuel pebble and TRISO particles \n
         ## Stored in the form {'layer':{'radius':outer_radius_of_layer, 'number_of_instances':number_of_layer_in_pebble}, ...}.
         self._geometry = {'fuel':      {'radius': self._kernel_data['fuel'],      'number_of_instance': self._kernels_per_pebble, 'volume': 0},
@@ -199,40 +374,57 @@ class FuelPebble(Pebble):
         self.calculate_volumes()
         
 
+    @property
+    def xs_fuel_library(self):
+        """!
+        Cross-section set for the fuel temperature.
+        """
+        return self._XS_TABLE_BY_BIN[self._fuel_xs_bin][0]
+
+    @property
+    def fuel_scattering_library(self):
+        """!
+        Graphite scattering library for the fuel temperature.
+        """
+        return self._XS_TABLE_BY_BIN[self._fuel_xs_bin][1]
+
     def update_fuel_material(self, material):
         """!
         Update the fuel material
         """
+        if not self._owns_material:
+            self._material = dict(self._material)
+            self._owns_material = True
         self._material['fuel'] = material
 
     def update_burnup(self, power, days):
         """!
         Add up the total power days the pebble has been in the core.
-        Divide by the kg of HM originally in the pebble (currently assumed to be 7 g or 0.007 kg)
+        Divide by the kg of HM originally in the pebble (`FUEL_KG_PER_PEBBLE`, currently assumed to be 7 g or 0.007 kg)
         To obtain the burnup in J/cm^3 
         """
         self._days_in_core += days
         self._power_density = power / (1E6) # Convert from W to MW, power of an individual pebble
         self._power_days += (self._power_density * days)
-        self._burnup =  self._power_days / 0.007 # MWd/kg
-        self._burnup_j_cm3 = self._power_days / self._triso_volume * 1E6 * 86400# for J/cm^3 we divide the power days (Watt-day or J/s * days) by the kernel volume (cm^3) and convert to MJ from J (1E6) and from days to seconds (86,400 s/day)
+        self._burnup = self._power_days * self._BU_MWD_FACTOR # MWd/kg
+        self._burnup_j_cm3 = self._power_days * self._bu_jcm3_factor # for J/cm^3 we divide the power days (Watt-day or J/s * days) by the kernel volume (cm^3) and convert to MJ from J (1E6) and from days to seconds (86,400 s/day)
         
     def set_universe(self):
         """!
         Update the current universe of the pebbble, if this is not the first pass (i.e. it has been shuffled, add the previous universe to the current pebble location        
         """
-        if self._shuffled:
-            self._universe = self._previous_universe + '_' + self._mesh_location
-        else:
-            split_univ = self._previous_universe.split('_')[1:]
-            univ = '' if len(split_univ) == 1 else '_'.join([x for x in split_univ[:-1]]) + '_'
-            self._universe = f'f{self._homogenization_group}_' + univ + self._mesh_location   
+        self._universe = _build_universe(self._shuffled, self._previous_universe, self._mesh_location, f'f{self._homogenization_group}_')
             
     def update_pebble_temperature(self,pebble_temp,fuel_temp=None):
         """!
-        Update the temperatures (and corresponding cross-sections) for both the pebble and fuel materials.
+        Update the temperatures (and corresponding cross-sections) for both the pebble and fuel materials. \n
+        If the fuel temperature falls in the same cross-section bin as the pebble temperature, the pebble bin is reused without a second lookup.
         """
         self._temperature = pebble_temp
         self._fuel_temperature = fuel_temp
-        self._xs_fuel_library, self._fuel_scattering_library = self.set_xs_set(fuel_temp)
-        self._xs_library, self._scattering_library = self.set_xs_set(pebble_temp)
+        xs_bin = self._bin_temperature(pebble_temp)
+        self._xs_bin = xs_bin
+        if self._XS_KEYS_SORTED[xs_bin] <= fuel_temp < self._XS_BIN_UPPER[xs_bin]:
+            self._fuel_xs_bin = xs_bin
+        else:
+            self._fuel_xs_bin = self._bin_temperature(fuel_temp)
@@ -4,11 +4,50 @@
 Copyright 2024, Battelle Energy Alliance, LLC, ALL RIGHTS RESERVED
 '''
 
+import functools
+from itertools import accumulate
 import math
+import numpy as np
 from kugelpy.kugelpy.sea_serpent.reactor import SerpentReactor
 import os
+import string
+
+@functools.lru_cache(maxsize=None)
+def _uv_cached(theta_deg, r=1):
+    """!
+    Memoized `SerpentReactor.convert_theta_to_uv()` for an angle in degrees. \n
+    Every block calls this several times with the same angle and only a few distinct radii.
+    """
+    theta = math.radians(theta_deg)
+    return (r*math.sin(theta), r*math.cos(theta))
+
+@functools.lru_cache(maxsize=None)
+def _dimple_names(block_id, num_dimples):
+    """!
+    Base names ('block_{id}_d{num}') of the dimples in a block along with the matching surface and cell names. \n
+    Shared by the dimple surface, cell, and universe builders so each name is only formatted once.
+    """
+    base_names = tuple(f'block_{block_id}_d{num}' for num in range(num_dimples))
+    return base_names, tuple(name + '_s' for name in base_names), tuple(name + '_c' for name in base_names)
 
 class PebbleBedReactor(SerpentReactor):
+
+    ## (str) Template of the reflector cell of a block, filled by `build_block_cell()`.
+    _BLOCK_CELL_TMPL = 'cell block_{id}_c block_{id}_u {material} -block_{id}_s {surfaces} {cells}'
+    ## (str) Template of the filling universe of a block, filled by `build_block_universe()`.
+    _BLOCK_UNIVERSE_TMPL = 'cell block_{id}_u 0 fill block_{id}_u -block_{id}_s {surfaces} {cells}'
+    ## (str) Template of a single dimple cell, filled by `build_dimple_cells()`.
+    _DIMPLE_CELL_TMPL = 'cell {dimple}_c pebbles_u fill pebble_bed -{dimple}_s -outer_dimple inner_dimple {block}_plane\n'
+    ## (str) Template of a single dimple universe, filled by `build_dimple_universes()`.
+    _DIMPLE_UNIVERSE_TMPL = 'cell {dimple}_u 0 fill pebbles_u -{dimple}_s -outer_dimple inner_dimple {block}_plane\n'
+    ## (str) Template of a control rod, safety rod, rod cavity, or riser cell, filled by `build_rod_cells()`.
+    _ROD_CELL_TMPL = 'cell block_{id}_{rod}_c block_{id}_{rod}_u {material} -block_{id}_{rod}_s {surfaces}  {cells}'
+    ## (str) Template of a control rod, safety rod, rod cavity, or riser universe, filled by `build_rod_universe()`.
+    _ROD_UNIVERSE_TMPL = 'cell block_{id}_{rod}_u 0 fill block_{id}_{rod}_u -block_{id}_{rod}_s {surfaces}  {cells}'
+    ## (str) Banner separating the sections of the core input written by `write_pbr_core()`.
+    _BANNER = '\n\n%%%%%%%%%%%%%%%%%%%%% {} %%%%%%%%%%%%%%%%%%%%%\n\n'
+    ## (frozenset) Attributes left out of `_geometry_key()`: the built geometry itself and the rod insertion depths filled in by `render_pbr_core()`.
+    _TEMPLATE_EXCLUDED = frozenset({'_block_dict', '_reactor_parts', '_core_template', '_core_template_key', 'cr_insertion_depth', 'sr_insertion_depth'})
     
     def __init__(self, **kwargs):
         
@@ -117,13 +156,18 @@ class PebbleBedReactor(SerpentReactor):
         ## (dict, default: {}) Contains information about the blocks used to define the radial reflector region \n
         ## This parameter is generally changed using `build_block().`
         self._block_dict = {}
-        ## (dict, default: {}) Dictionary storing geometry information used to build the reactor model.
-        self._reactor_dict = {}
+        ## (list, default: []) (label, text) pairs, in build order, storing geometry information used to build the reactor model. \n
+        ## The nested dictionary view is available as `_reactor_dict`.
+        self._reactor_parts = []
+        ## (string.Template, default: None) Core input with placeholders for the control and safety rod surfaces, built by `build_core_template()` and filled by `render_pbr_core()`.
+        self._core_template = None
+        ## (str, default: None) `_geometry_key()` of the parameters `_core_template` was built from, the template is rebuilt when they change.
+        self._core_template_key = None
         ## (float, default: 360 / self.number_of_blocks) Angle between the centerlines of neighboring blocks.
         self._block_angle = 360 / self.number_of_blocks
         ## (list, default: ) List of angles of centerline for each block \n
         ##  We added the 90 degree rotation to align with the pebble model generated from ProjectChrono.
-        self._block_angles = [self._block_angle * block_num + 90 for block_num in range(self.number_of_blocks)] 
+        self._block_angles = (np.arange(self.number_of_blocks) * self._block_angle + 90).tolist()
 
         for k,v in kwargs.items():
             setattr(self, k, v)
@@ -137,251 +181,423 @@ class PebbleBedReactor(SerpentReactor):
         self.__init__heights()
         
     def __init__heights(self):
-        self.lower_model_height = -(self.bottom_reflector_height + self.conus_channel_height + self.outlet_plenum_height)
-
-        self.bottom_reflector_lower_height = self.lower_model_height
-        self.bottom_reflector_upper_height = self.bottom_reflector_lower_height + self.bottom_reflector_height
-        
-        self.outlet_plenum_lower_height = self.bottom_reflector_upper_height
-        self.outlet_plenum_upper_height = self.outlet_plenum_lower_height + self.outlet_plenum_height    
-        
-        self.outlet_channel_lower_height = self.outlet_plenum_upper_height
-        self.outlet_channel_upper_height = self.outlet_channel_lower_height + self.conus_channel_height
-        
-        self.pebble_shoot_lower_height = self.lower_model_height
-        self.pebble_shoot_upper_height = self.pebble_shoot_lower_height + self.pebble_chute_height     
-        
-        self.pebble_bed_lower_height = self.outlet_channel_upper_height
-        self.pebble_bed_upper_height = self.pebble_bed_lower_height + self.pebble_bed_height
-        
-        self.cavity_lower_height = self.pebble_bed_upper_height
-        self.cavity_upper_height = self.cavity_lower_height + self.cavity_height
-        
-        self.top_reflector_lower_height = self.cavity_upper_height
-        self.top_reflector_upper_height = self.top_reflector_lower_height + self.top_reflector_height    
-        
-        self.model_upper_height = self.top_reflector_upper_height
-        
-        self.control_rod_lower_height = self.pebble_bed_lower_height
-        self.control_rod_upper_height = self.model_upper_height
+        """!
+        Set the lower and upper axial height of each core region. \n
+        Regions are stacked from the bottom reflector up to the top reflector, so the boundaries are a single cumulative sum of the region heights.
+        """
+        lower_model_height = -(self.bottom_reflector_height + self.conus_channel_height + self.outlet_plenum_height)
+        (bottom_reflector_lower, outlet_plenum_lower, outlet_channel_lower, pebble_bed_lower,
+         cavity_lower, top_reflector_lower, model_upper) = accumulate((self.bottom_reflector_height, self.outlet_plenum_height, self.conus_channel_height,
+                                                                      self.pebble_bed_height, self.cavity_height, self.top_reflector_height), initial=lower_model_height)
 
-        self.riser_lower_height = self.pebble_bed_lower_height
-        self.riser_upper_height = self.cavity_upper_height
+        self.__dict__.update({'lower_model_height': lower_model_height,
+                              'bottom_reflector_lower_height': bottom_reflector_lower,
+                              'bottom_reflector_upper_height': outlet_plenum_lower,
+                              'outlet_plenum_lower_height': outlet_plenum_lower,
+                              'outlet_plenum_upper_height': outlet_channel_lower,
+                              'outlet_channel_lower_height': outlet_channel_lower,
+                              'outlet_channel_upper_height': pebble_bed_lower,
+                              'pebble_shoot_lower_height': lower_model_height,
+                              'pebble_shoot_upper_height': lower_model_height + self.pebble_chute_height,
+                              'pebble_bed_lower_height': pebble_bed_lower,
+                              'pebble_bed_upper_height': cavity_lower,
+                              'cavity_lower_height': cavity_lower,
+                              'cavity_upper_height': top_reflector_lower,
+                              'top_reflector_lower_height': top_reflector_lower,
+                              'top_reflector_upper_height': model_upper,
+                              'model_upper_height': model_upper,
+                              'control_rod_lower_height': pebble_bed_lower,
+                              'control_rod_upper_height': model_upper,
+                              'riser_lower_height': pebble_bed_lower,
+                              'riser_upper_height': top_reflector_lower})
     
-    def build_block(self, block_id, angle):
+    def _block_specs(self, block_ids, angles):
+        """!
+        Table of the per-block parameters used by `build_block()`, computed for all blocks at once. \n
+        Returns one dict per block with the rod type, rod material, rod lower height, and the precomputed (u, v) of the dimple plane, control rod, and riser.
+        """
+        theta = np.radians(np.asarray(angles, dtype=np.float64) + 100)
+        dimple_uv, rod_uv, riser_uv = (list(map(tuple, self.convert_thetas_to_uv(theta, r).tolist())) for r in (1, self.radius_to_cr_center, self.radius_to_riser_center))
+        cr_spec = {'rod_type': 'cr', 'rod_material': self._control_rod_material, 'rod_lower_height': self.pebble_bed_upper_height - self.cr_insertion_depth}
+        sr_spec = {'rod_type': 'sr', 'rod_material': self._safety_rod_material, 'rod_lower_height': self.pebble_bed_upper_height - self.sr_insertion_depth}
+        return [{**(cr_spec if block_id % 2 == 0 else sr_spec), 'dimple_uv': dimple_uv[idx], 'rod_uv': rod_uv[idx], 'riser_uv': riser_uv[idx]}
+                for idx, block_id in enumerate(block_ids)]
+
+    def build_block(self, block_id, angle, spec=None):
         """
         Collection of function required to build a reflector block.
+        `spec` is the entry for this block from `_block_specs()`, it is computed if not supplied.
         """
-        self._block_dict[block_id] = {'surfaces': {'block': '', 'dimples': '', 'control_rods': '', 'risers': ''},
-                                     'cells': {'block': '', 'dimples': '', 'control_rods': '', 'risers': ''},
-                                     'universes': {'block': '', 'dimples': '', 'control_rods': '', 'risers': ''},}
+        spec = spec if spec else self._block_specs([block_id], [angle])[0]
+        # Bind the block sections and repeatedly used attributes to locals once
+        surfaces = {'block': '', 'dimples': '', 'control_rods': '', 'risers': ''}
+        cells = {'block': '', 'dimples': '', 'control_rods': '', 'risers': ''}
+        universes = {'block': '', 'dimples': '', 'control_rods': '', 'risers': ''}
+        self._block_dict[block_id] = {'surfaces': surfaces, 'cells': cells, 'universes': universes}
+        build_rod_surfaces, build_rod_cells, build_rod_universe = self.build_rod_surfaces, self.build_rod_cells, self.build_rod_universe
+        num_dimples = self.num_dimples
+        radius_to_cr_center = self.radius_to_cr_center
+        control_rod_upper_height = self.control_rod_upper_height
         
         surfaces_to_skip = []
         cells_to_skip = []
-        self._block_dict[block_id]['surfaces']['block'] = self.build_block_surface(block_id, self.block_inner_radius, self.block_outer_radius, angle, angle+self._block_angle)
+        surfaces['block'] = self.build_block_surface(block_id, self.block_inner_radius, self.block_outer_radius, angle, angle+self._block_angle)
         
         if self.create_dimples:
-            dimple_surface_names, dimple_surfaces = self.build_dimple_surfaces(block_id, self.dimple_radius, angle, self.num_dimples)
-            self._block_dict[block_id]['surfaces']['dimples'] = dimple_surfaces
-            dimple_cell_names, dimple_cells = self.build_dimple_cells(block_id,self.num_dimples)
-            self._block_dict[block_id]['cells']['dimples'] = dimple_cells
-            self._block_dict[block_id]['universes']['dimples'] = self.build_dimple_universes(block_id,self.num_dimples)
+            dimple_surface_names, dimple_surfaces = self.build_dimple_surfaces(block_id, self.dimple_radius, angle, num_dimples, uv=spec['dimple_uv'])
+            surfaces['dimples'] = dimple_surfaces
+            dimple_cell_names, dimple_cells = self.build_dimple_cells(block_id,num_dimples)
+            cells['dimples'] = dimple_cells
+            universes['dimples'] = self.build_dimple_universes(block_id,num_dimples)
             cells_to_skip += dimple_cell_names
         
         if not self.simple_core:
             # Grab all of the surfaces, cells, and universes for the safety and control rods
-            rod_type = 'cr' if block_id % 2 == 0 else 'sr'
-            cr_insertion_depth = self.cr_insertion_depth if rod_type == 'cr' else self.sr_insertion_depth
-            rod_material = self._control_rod_material if rod_type == 'cr' else self._safety_rod_material
-            control_rod_surface_names, control_rod_surfaces = self.build_rod_surfaces(block_id, self.radius_to_cr_center, self.control_rod_radius, angle, rod_type, self.pebble_bed_upper_height - cr_insertion_depth, self.control_rod_upper_height)
-            self._block_dict[block_id]['surfaces']['control_rod'] = control_rod_surfaces
-            control_rod_cell_names, control_rod_cells = self.build_rod_cells(block_id, rod_type, rod_material)
-            self._block_dict[block_id]['cells']['control_rod'] = control_rod_cells
-            self._block_dict[block_id]['universes']['control'] = self.build_rod_universe(block_id, rod_type)
+            rod_type = spec['rod_type']
+            rod_material = spec['rod_material']
+            control_rod_surface_names, control_rod_surfaces = build_rod_surfaces(block_id, radius_to_cr_center, self.control_rod_radius, angle, rod_type, spec['rod_lower_height'], control_rod_upper_height, uv=spec['rod_uv'])
+            surfaces['control_rod'] = control_rod_surfaces
+            control_rod_cell_names, control_rod_cells = build_rod_cells(block_id, rod_type, rod_material)
+            cells['control_rod'] = control_rod_cells
+            universes['control'] = build_rod_universe(block_id, rod_type)
             cells_to_skip += control_rod_cell_names        
 
-            control_rod_cavity_surface_names, control_rod_cavity_surfaces = self.build_rod_surfaces(block_id, self.radius_to_cr_center, self.control_rod_cavity_radius, angle, 'cr_cavity', self.control_rod_lower_height, self.control_rod_upper_height)
-            self._block_dict[block_id]['surfaces']['control_rod_cavity'] = control_rod_cavity_surfaces
-            control_rod_cavity_cell_names, control_rod_cavity_cells = self.build_rod_cells(block_id, 'cr_cavity', self._cavity_material, cells_to_skip=control_rod_cell_names)
-            self._block_dict[block_id]['cells']['control_rod_cavity'] = control_rod_cavity_cells
-            self._block_dict[block_id]['universes']['control_rod_cavity'] = self.build_rod_universe(block_id, 'cr_cavity',cells_to_skip=control_rod_cell_names)
+            control_rod_cavity_surface_names, control_rod_cavity_surfaces = build_rod_surfaces(block_id, radius_to_cr_center, self.control_rod_cavity_radius, angle, 'cr_cavity', self.control_rod_lower_height, control_rod_upper_height, uv=spec['rod_uv'])
+            surfaces['control_rod_cavity'] = control_rod_cavity_surfaces
+            control_rod_cavity_cell_names, control_rod_cavity_cells = build_rod_cells(block_id, 'cr_cavity', self._cavity_material, cells_to_skip=control_rod_cell_names)
+            cells['control_rod_cavity'] = control_rod_cavity_cells
+            universes['control_rod_cavity'] = build_rod_universe(block_id, 'cr_cavity',cells_to_skip=control_rod_cell_names)
             cells_to_skip += control_rod_cavity_cell_names        
 
             # Grab all of the surfaces, cells, and universes for the risers
             rod_type = 'riser'
-            risers_surface_names, risers_surfaces = self.build_rod_surfaces(block_id, self.radius_to_riser_center, self.riser_radius, angle, rod_type, self.riser_lower_height, self.riser_upper_height)
-            self._block_dict[block_id]['surfaces']['risers'] = risers_surfaces
-            risers_cell_names, risers_cells = self.build_rod_cells(block_id, rod_type, self.riser_material)
-            self._block_dict[block_id]['cells']['risers'] = risers_cells
-            self._block_dict[block_id]['universes']['risers'] = self.build_rod_universe(block_id, rod_type)
+            risers_surface_names, risers_surfaces = build_rod_surfaces(block_id, self.radius_to_riser_center, self.riser_radius, angle, rod_type, self.riser_lower_height, self.riser_upper_height, uv=spec['riser_uv'])
+            surfaces['risers'] = risers_surfaces
+            risers_cell_names, risers_cells = build_rod_cells(block_id, rod_type, self.riser_material)
+            cells['risers'] = risers_cells
+            universes['risers'] = build_rod_universe(block_id, rod_type)
             cells_to_skip += risers_cell_names  
         
-        self._block_dict[block_id]['cells']['block'] = self.build_block_cell(block_id,surfaces_to_skip=surfaces_to_skip,
-                                                                           cells_to_skip=cells_to_skip)
-        self._block_dict[block_id]['universes']['block'] = self.build_block_universe(block_id,surfaces_to_skip=surfaces_to_skip,
-                                                                                       cells_to_skip=cells_to_skip)
+        cells['block'] = self.build_block_cell(block_id,surfaces_to_skip=surfaces_to_skip,
+                                               cells_to_skip=cells_to_skip)
+        universes['block'] = self.build_block_universe(block_id,surfaces_to_skip=surfaces_to_skip,
+                                                       cells_to_skip=cells_to_skip)
 
-    def build_all_blocks(self):
-        # Grab all of the surfaces, cells, and universes for the dimples
+    def _add_region(self, region_name, **sections):
+        """!
+        Store the sections (surface, cells, universes) of a core region in `_reactor_parts`. \n
+        Rebuilding a region replaces its parts in place.
+        """
+        parts = [(f'{region_name} {print_type}', text) for print_type, text in sections.items()]
+        old = [i for i, (label, _) in enumerate(self._reactor_parts) if label.rpartition(' ')[0] == region_name]
+        if old:
+            self._reactor_parts[old[0]:old[-1]+1] = parts
+        else:
+            self._reactor_parts.extend(parts)
+
+    @property
+    def _reactor_dict(self):
+        """!
+        Nested {region: {section: text}} view of `_reactor_parts`, assigning a dictionary replaces the stored regions.
+        """
+        reactor_dict = {}
+        for label, text in self._reactor_parts:
+            region_name, _, print_type = label.rpartition(' ')
+            reactor_dict.setdefault(region_name, {})[print_type] = text
+        return reactor_dict
+
+    @_reactor_dict.setter
+    def _reactor_dict(self, reactor_dict):
+        """!
+        Replace every core region with the sections of a nested {region: {section: text}} dictionary, rebuilding `_reactor_parts`. \n
+        The getter returns a new dictionary on each access, so changes have to be assigned back (or made with `_add_region()`) to take effect.
+        """
+        self._reactor_parts = [(f'{region_name} {print_type}', text) for region_name, sections in reactor_dict.items() for print_type, text in sections.items()]
+
+    def build_dimple_cylinders(self):
+        """!
+        Build the inner and outer cylinders bounding the dimples along the core wall.
+        """
         if self.create_dimples:
-            self._reactor_dict['dimples'] = {'surface': self.build_cylinder_surface('inner_dimple', 'cylz', self.block_inner_radius, lower_height=self.pebble_bed_lower_height, upper_height=self.pebble_bed_upper_height)}
-            self._reactor_dict['dimples']['surface'] += self.build_cylinder_surface('outer_dimple', 'cylz', self.block_inner_radius + self.dimple_depth, lower_height=self.pebble_bed_lower_height, upper_height=self.pebble_bed_upper_height) 
+            inner_radius, lower_height, upper_height = self.block_inner_radius, self.pebble_bed_lower_height, self.pebble_bed_upper_height
+            self._add_region('dimples', surface=''.join([self.build_cylinder_surface('inner_dimple', 'cylz', inner_radius, lower_height=lower_height, upper_height=upper_height),
+                                                         self.build_cylinder_surface('outer_dimple', 'cylz', inner_radius + self.dimple_depth, lower_height=lower_height, upper_height=upper_height)]))
+
+    def build_all_blocks(self, out=None):
+        """!
+        Build the dimple cylinders and every reflector block. \n
+        If `out` is an open file, each block is written to it as soon as it is built and is not kept in `_block_dict` (the dimple cylinders are then left to `build_pbr_core()`).
+        """
+        # Grab all of the surfaces, cells, and universes for the dimples
+        if out is None:
+            self.build_dimple_cylinders()
 
-        for block_id, angle in enumerate(self._block_angles):
-            self.build_block(block_id, angle)
+        specs = self._block_specs(range(len(self._block_angles)), self._block_angles)
+        for block_id, (angle, spec) in enumerate(zip(self._block_angles, specs)):
+            self.build_block(block_id, angle, spec=spec)
+            if out is not None:
+                out.write(''.join(self._block_fragments(block_id, self._block_dict.pop(block_id))))
     
-    def build_pbr_core(self):
+    def build_pbr_core(self, out=None):
+        """!
+        Build the surfaces, cells, and universes of the whole core. \n
+        If `out` is an open file, the core input is streamed to it while it is built (in the same layout as `write_pbr_core()`) instead of being stored in `_block_dict` and `_reactor_parts`. \n
+        Streaming works on scratch copies of those, so any geometry already built on this reactor is left untouched.
+        """
         if self.simple_core:
-           self.build_bottom_reflector()
-           self.build_all_blocks()
-           self.build_pebble_bed()
-           self.build_pebble()
-           self.build_top_reflector()
-           self.build_outside()         
+            regions = [self.build_bottom_reflector,
+                       self.build_all_blocks,
+                       self.build_pebble_bed,
+                       self.build_pebble,
+                       self.build_top_reflector,
+                       self.build_outside]
         else:
-            self.build_pebble_shoot()  
-            self.build_conus(z_offset=self.conus_z_offset, radius=self.block_inner_radius, height=self.conus_height)
-            self.build_outlet_plenum()
-            self.build_outlet_channel()
-            self.build_bottom_reflector()
-            self.build_all_blocks()
-            self.build_pebble_bed()
-            self.build_pebble()
-            self.build_cavity()
-            self.build_top_reflector()
-            self.build_outside()
+            regions = [self.build_pebble_shoot,
+                       functools.partial(self.build_conus, z_offset=self.conus_z_offset, radius=self.block_inner_radius, height=self.conus_height),
+                       self.build_outlet_plenum,
+                       self.build_outlet_channel,
+                       self.build_bottom_reflector,
+                       self.build_all_blocks,
+                       self.build_pebble_bed,
+                       self.build_pebble,
+                       self.build_cavity,
+                       self.build_top_reflector,
+                       self.build_outside]
+
+        if out is None:
+            for build_region in regions:
+                build_region()
+            return
+
+        block_dict, reactor_parts = self._block_dict, self._reactor_parts
+        self._block_dict = {}
+        self._reactor_parts = []
+        try:
+            # The blocks come first in the core input, followed by the other regions in build order
+            self.build_all_blocks(out=out)
+            for build_region in regions:
+                if build_region == self.build_all_blocks:
+                    self.build_dimple_cylinders()
+                else:
+                    build_region()
+                out.writelines(self._part_fragments(self._reactor_parts))
+                self._reactor_parts.clear()
+        finally:
+            self._block_dict, self._reactor_parts = block_dict, reactor_parts
     
     def build_conus(self, surface_name='conus_s', x_offset=0.0, y_offset=0.0, z_offset=0.0, radius=0.0, height=0.0):
-        surf = f'surf {surface_name} cone {x_offset} {y_offset} {z_offset} {radius} -{height}\n'
-        surf += f'trans s conus_s rot 0.0 0.0  {z_offset}      0. 0. 1. 180.\n'
-        surf += f'surf upper_cone pz {self.pebble_bed_lower_height}'
-        self._reactor_dict['conus'] = {'surface': surf}
-        self._reactor_dict['conus']['cells'] = self.build_filled_cell('cone_c', 'cone_u', 'pebble_bed', ['conus_s'])
-        self._reactor_dict['conus']['universes'] = self.build_universe('cone_u', ['conus_s', 'upper_cone'], outside_surfaces=['pebble_shoot_s'])
+        surf = (f'surf {surface_name} cone {x_offset} {y_offset} {z_offset} {radius} -{height}\n'
+                f'trans s conus_s rot 0.0 0.0  {z_offset}      0. 0. 1. 180.\n'
+                f'surf upper_cone pz {self.pebble_bed_lower_height}')
+        self._add_region('conus',
+                         surface=surf,
+                         cells=self.build_filled_cell('cone_c', 'cone_u', 'pebble_bed', ['conus_s']),
+                         universes=self.build_universe('cone_u', ['conus_s', 'upper_cone'], outside_surfaces=['pebble_shoot_s']))
 
     def build_outlet_plenum(self):
         surf = self.build_cylinder_surface('outlet_plenum_s', 'cylz', self.block_inner_radius, lower_height=self.outlet_plenum_lower_height, upper_height=self.outlet_plenum_upper_height)
-        self._reactor_dict['outlet_plenum'] = {'surface': surf}
-        self._reactor_dict['outlet_plenum']['cells'] = self.build_cell('outlet_plenum_c', 'outlet_plenum_u', self._outlet_plenum_material, ['outlet_plenum_s'], outside_surfaces=['pebble_shoot_s'])
-        self._reactor_dict['outlet_plenum']['universes'] = self.build_universe('outlet_plenum_u', ['outlet_plenum_s'], outside_surfaces=['pebble_shoot_s'])
+        self._add_region('outlet_plenum',
+                         surface=surf,
+                         cells=self.build_cell('outlet_plenum_c', 'outlet_plenum_u', self._outlet_plenum_material, ['outlet_plenum_s'], outside_surfaces=['pebble_shoot_s']),
+                         universes=self.build_universe('outlet_plenum_u', ['outlet_plenum_s'], outside_surfaces=['pebble_shoot_s']))
         
     def build_outlet_channel(self):
         surf = self.build_cylinder_surface('outlet_channel_s', 'cylz', self.block_inner_radius, lower_height=self.outlet_channel_lower_height, upper_height=self.outlet_channel_upper_height)
-        self._reactor_dict['outlet_channel'] = {'surface': surf}
-        self._reactor_dict['outlet_channel']['cells'] = self.build_cell('outlet_channel_c', 'outlet_channel_u', self._outlet_channel_material, ['outlet_channel_s'], outside_surfaces=['pebble_shoot_s', 'conus_s'])
-        self._reactor_dict['outlet_channel']['universes'] = self.build_universe('outlet_channel_u', ['outlet_channel_s'], outside_surfaces=['pebble_shoot_s', 'conus_s'])
+        self._add_region('outlet_channel',
+                         surface=surf,
+                         cells=self.build_cell('outlet_channel_c', 'outlet_channel_u', self._outlet_channel_material, ['outlet_channel_s'], outside_surfaces=['pebble_shoot_s', 'conus_s']),
+                         universes=self.build_universe('outlet_channel_u', ['outlet_channel_s'], outside_surfaces=['pebble_shoot_s', 'conus_s']))
 
     def build_pebble_shoot(self):
         surf = self.build_cylinder_surface('pebble_shoot_s', 'cylz', self.pebble_shoot_radius , lower_height=self.pebble_shoot_lower_height, upper_height=self.pebble_shoot_upper_height)
-        self._reactor_dict['pebble_shoot'] = {'surface': surf}
-        #self._reactor_dict['pebble_shoot']['cells'] = self.build_filled_cell('pebble_shoot_c', 'pebble_shoot_u', 'pebble_bed', ['pebble_shoot_s'])
-        self._reactor_dict['pebble_shoot']['cells'] = self.build_cell('pebble_shoot_c', 'pebble_shoot_u', self._pebble_shoot_material, ['pebble_shoot_s'])
-        self._reactor_dict['pebble_shoot']['universes'] = self.build_universe('pebble_shoot_u', ['pebble_shoot_s'])
+        self._add_region('pebble_shoot',
+                         surface=surf,
+                         #cells=self.build_filled_cell('pebble_shoot_c', 'pebble_shoot_u', 'pebble_bed', ['pebble_shoot_s']),
+                         cells=self.build_cell('pebble_shoot_c', 'pebble_shoot_u', self._pebble_shoot_material, ['pebble_shoot_s']),
+                         universes=self.build_universe('pebble_shoot_u', ['pebble_shoot_s']))
 
     def build_bottom_reflector(self):
         pebble_shoot_surface = '' if self.simple_core else 'pebble_shoot_s'
         surf = self.build_cylinder_surface('bottom_reflector_s', 'cylz', self.block_inner_radius, lower_height=self.bottom_reflector_lower_height, upper_height=self.bottom_reflector_upper_height)
-        self._reactor_dict['bottom_reflector'] = {'surface': surf}
-        self._reactor_dict['bottom_reflector']['cells'] = self.build_cell('bottom_reflector_c', 'bottom_reflector_u', self._block_material, ['bottom_reflector_s'], outside_surfaces=[pebble_shoot_surface])
-        self._reactor_dict['bottom_reflector']['universes'] = self.build_universe('bottom_reflector_u', ['bottom_reflector_s'], outside_surfaces=[pebble_shoot_surface])
+        self._add_region('bottom_reflector',
+                         surface=surf,
+                         cells=self.build_cell('bottom_reflector_c', 'bottom_reflector_u', self._block_material, ['bottom_reflector_s'], outside_surfaces=[pebble_shoot_surface]),
+                         universes=self.build_universe('bottom_reflector_u', ['bottom_reflector_s'], outside_surfaces=[pebble_shoot_surface]))
         
     def build_pebble_bed(self):
-        surf  = 'surf inf_surf inf\n'
-        surf += f'pbed pebble_bed helium_u "{self.pebble_bed_name}" pow\n' 
-        surf += self.build_cylinder_surface('pebbles_s', 'cylz', self.block_inner_radius, lower_height=self.pebble_bed_lower_height, upper_height=self.pebble_bed_upper_height)
-        self._reactor_dict['pebble_bed'] = {'surface': surf}
-        self._reactor_dict['pebble_bed']['cells'] = 'cell c_he helium_u helium  -inf_surf\n'
-        self._reactor_dict['pebble_bed']['cells'] += self.build_filled_cell('pebbles_c', 'pebbles_u', 'pebble_bed', ['pebbles_s'])
-        self._reactor_dict['pebble_bed']['universes'] = self.build_universe('pebbles_u', ['pebbles_s'])
+        surf = ''.join(['surf inf_surf inf\n',
+                        f'pbed pebble_bed helium_u "{self.pebble_bed_name}" pow\n',
+                        self.build_cylinder_surface('pebbles_s', 'cylz', self.block_inner_radius, lower_height=self.pebble_bed_lower_height, upper_height=self.pebble_bed_upper_height)])
+        self._add_region('pebble_bed',
+                         surface=surf,
+                         cells='cell c_he helium_u helium  -inf_surf\n' + self.build_filled_cell('pebbles_c', 'pebbles_u', 'pebble_bed', ['pebbles_s']),
+                         universes=self.build_universe('pebbles_u', ['pebbles_s']))
         
     def build_pebble(self):
-        surf = f'surf pebble_inner sph 0. 0. 0. {self.pebble_inner_radius}\n'
-        surf += f'surf pebble_outer sph 0. 0. 0. {self.pebble_outer_radius}\n'
-        self._reactor_dict['pebble'] = {'surface': surf}
+        surf = (f'surf pebble_inner sph 0. 0. 0. {self.pebble_inner_radius}\n'
+                f'surf pebble_outer sph 0. 0. 0. {self.pebble_outer_radius}\n')
+        self._add_region('pebble', surface=surf)
         
     def build_outside(self):
-        self._reactor_dict['outside'] = {'surface': self.build_cylinder_surface('outside_s', 'cylz', self.block_outer_radius, self.bottom_reflector_lower_height, self.model_upper_height)}
-        self._reactor_dict['outside']['universe'] = 'cell out        0 outside            outside_s'
+        self._add_region('outside',
+                         surface=self.build_cylinder_surface('outside_s', 'cylz', self.block_outer_radius, self.bottom_reflector_lower_height, self.model_upper_height),
+                         universe='cell out        0 outside            outside_s')
         
     def build_cavity(self):
-        self._reactor_dict['cavity'] = {'surface':self.build_cylinder_surface('cavity_s', 'cylz', self.block_inner_radius, self.cavity_lower_height, self.cavity_upper_height)} 
-        self._reactor_dict['cavity']['cells'] = self.build_cell('cavity_c', 'cavity_u', self._cavity_material, ['cavity_s'])
-        self._reactor_dict['cavity']['universes'] = self.build_universe('cavity_u', ['cavity_s'])
+        self._add_region('cavity',
+                         surface=self.build_cylinder_surface('cavity_s', 'cylz', self.block_inner_radius, self.cavity_lower_height, self.cavity_upper_height),
+                         cells=self.build_cell('cavity_c', 'cavity_u', self._cavity_material, ['cavity_s']),
+                         universes=self.build_universe('cavity_u', ['cavity_s']))
         
     def build_top_reflector(self):
-        self._reactor_dict['top_reflector'] = {'surface':self.build_cylinder_surface('top_reflector_s', 'cylz', self.block_inner_radius, self.top_reflector_lower_height, self.top_reflector_upper_height)} 
-        self._reactor_dict['top_reflector']['cells'] = self.build_cell('top_reflector_c', 'top_reflector_u', self._block_material, ['top_reflector_s'])
-        self._reactor_dict['top_reflector']['universes'] = self.build_universe('top_reflector_u', ['top_reflector_s'])
+        self._add_region('top_reflector',
+                         surface=self.build_cylinder_surface('top_reflector_s', 'cylz', self.block_inner_radius, self.top_reflector_lower_height, self.top_reflector_upper_height),
+                         cells=self.build_cell('top_reflector_c', 'top_reflector_u', self._block_material, ['top_reflector_s']),
+                         universes=self.build_universe('top_reflector_u', ['top_reflector_s']))
             
-    def build_block_surface(sefl, id_, ir_, or_, ang1, ang2, x_offset=0.0, y_offset=0.0):
+    @staticmethod
+    def build_block_surface(id_, ir_, or_, ang1, ang2, x_offset=0.0, y_offset=0.0):
         return f'surf block_{id_}_s  pad {x_offset} {y_offset} {ir_} {or_} {ang1} {ang2}\n'
         
-    def build_dimple_surfaces(self, id_, dr_, ang, num_dimples, x_offset=0.0, y_offset=0.0):
+    def build_dimple_surfaces(self, id_, dr_, ang, num_dimples, x_offset=0.0, y_offset=0.0, uv=None):
+        if not (self.create_dimples and num_dimples):
+            return [], ''
         # 7.0 is the dimple off set
         base_height = self.dimple_axial_offset + self.pebble_bed_lower_height + self.dimple_radius if id_ % 2 == 0 else self.pebble_bed_lower_height + self.dimple_radius * 4
-        u, v = self.convert_theta_to_uv(math.radians(ang+100))
-        dimple = f'surf block_{id_}_plane plane {u} {v}\n'
-        dimple_surfaces = []
-        for num in range(num_dimples):
+        u, v = uv if uv else _uv_cached(ang+100)
+        block = f'block_{id_}'
+        dimple = [f'surf {block}_plane plane {u} {v}\n']
+        _, dimple_surfaces, _ = _dimple_names(id_, num_dimples)
+        for num, surface_name in enumerate(dimple_surfaces):
             z_offset=base_height + num * dr_ * 4
-            dimple += self.build_cylinder_surface(f'block_{id_}_d{num}_s', 'cylv', dr_, x_offset=x_offset, y_offset=y_offset, z_offset=z_offset, u=u, v=v, w=0.0)
-            dimple_surfaces.append(f'block_{id_}_d{num}_s')
-        return dimple_surfaces, dimple
+            dimple.append(self.build_cylinder_surface(surface_name, 'cylv', dr_, x_offset=x_offset, y_offset=y_offset, z_offset=z_offset, u=u, v=v, w=0.0))
+        return list(dimple_surfaces), ''.join(dimple)
         
-    def build_rod_surfaces(self, id_, r2c, or_, ang, rod_type, lh, uh):
-        u, v = self.convert_theta_to_uv(math.radians(ang+100), r=r2c)    
+    def build_rod_surfaces(self, id_, r2c, or_, ang, rod_type, lh, uh, uv=None):
+        u, v = uv if uv else _uv_cached(ang+100, r2c)
         return f'block_{id_}_{rod_type}_s', self.build_cylinder_surface(f'block_{id_}_{rod_type}_s', 'cylz', or_, x_offset=u, y_offset=v,  lower_height=lh, upper_height=uh)
         
-    def build_block_cell(self, id_, surfaces_to_skip=[], cells_to_skip=[]):
-        surfaces_to_skip_str = ' '.join(surf for surf in surfaces_to_skip)
-        cells_to_skip_str = '#' + ' #'.join(surf for surf in cells_to_skip) if len(cells_to_skip)>0 else ''
+    def build_block_cell(self, id_, surfaces_to_skip=None, cells_to_skip=None):
+        surfaces_to_skip_str = ' '.join(surfaces_to_skip) if surfaces_to_skip else ''
+        cells_to_skip_str = '#' + ' #'.join(cells_to_skip) if cells_to_skip else ''
     
-        return f'cell block_{id_}_c block_{id_}_u {self._block_material} -block_{id_}_s {surfaces_to_skip_str} {cells_to_skip_str}'
+        return self._BLOCK_CELL_TMPL.format(id=id_, material=self._block_material, surfaces=surfaces_to_skip_str, cells=cells_to_skip_str)
     
     def build_dimple_cells(self, block_id, num):
-        cell = ''
-        dimple_cells = []
-        for num in range(num):
-            cell += f'cell block_{block_id}_d{num}_c pebbles_u fill pebble_bed -block_{block_id}_d{num}_s -outer_dimple inner_dimple block_{block_id}_plane\n'   
-            dimple_cells.append(f'block_{block_id}_d{num}_c')
-        return dimple_cells, cell
+        if not (self.create_dimples and num):
+            return [], ''
+        block = f'block_{block_id}'
+        base_names, _, dimple_cells = _dimple_names(block_id, num)
+        return list(dimple_cells), ''.join([self._DIMPLE_CELL_TMPL.format(block=block, dimple=dimple) for dimple in base_names])
     
-    def build_rod_cells(self, block_id, rod_type, material, surfaces_to_skip=[], cells_to_skip=[]):
-        surfaces_to_skip_str = ' '.join(surf for surf in surfaces_to_skip)
-        cells_to_skip_str = '' if cells_to_skip == [] else '#' + ' #'.join(surf for surf in cells_to_skip)
-        cell_str = f'cell block_{block_id}_{rod_type}_c block_{block_id}_{rod_type}_u {material} -block_{block_id}_{rod_type}_s {surfaces_to_skip_str}  {cells_to_skip_str}'
+    def build_rod_cells(self, block_id, rod_type, material, surfaces_to_skip=None, cells_to_skip=None):
+        surfaces_to_skip_str = ' '.join(surfaces_to_skip) if surfaces_to_skip else ''
+        cells_to_skip_str = '#' + ' #'.join(cells_to_skip) if cells_to_skip else ''
+        cell_str = self._ROD_CELL_TMPL.format(id=block_id, rod=rod_type, material=material, surfaces=surfaces_to_skip_str, cells=cells_to_skip_str)
         cell = [f'block_{block_id}_{rod_type}_c']
         return cell, cell_str
         
-    def build_block_universe(self, id_, surfaces_to_skip=[], cells_to_skip=[]):
-        surfaces_to_skip_str = ' '.join(surf for surf in surfaces_to_skip)
-        cells_to_skip_str = '#' + ' #'.join(surf for surf in cells_to_skip) if len(cells_to_skip)>0 else ''
-        return f'cell block_{id_}_u 0 fill block_{id_}_u -block_{id_}_s {surfaces_to_skip_str} {cells_to_skip_str}'
+    def build_block_universe(self, id_, surfaces_to_skip=None, cells_to_skip=None):
+        surfaces_to_skip_str = ' '.join(surfaces_to_skip) if surfaces_to_skip else ''
+        cells_to_skip_str = '#' + ' #'.join(cells_to_skip) if cells_to_skip else ''
+        return self._BLOCK_UNIVERSE_TMPL.format(id=id_, surfaces=surfaces_to_skip_str, cells=cells_to_skip_str)
     
     def build_dimple_universes(self, block_id, num):
-        cell = ''
-        for num in range(num):
-            cell += f'cell block_{block_id}_d{num}_u 0 fill pebbles_u -block_{block_id}_d{num}_s -outer_dimple inner_dimple block_{block_id}_plane\n'   
-        return cell
+        if not (self.create_dimples and num):
+            return ''
+        block = f'block_{block_id}'
+        base_names, _, _ = _dimple_names(block_id, num)
+        return ''.join([self._DIMPLE_UNIVERSE_TMPL.format(block=block, dimple=dimple) for dimple in base_names])
     
-    def build_rod_universe(self, block_id, rod_type, surfaces_to_skip=[], cells_to_skip=[]):
-        surfaces_to_skip_str = ' '.join(surf for surf in surfaces_to_skip)
-        cells_to_skip_str = '' if cells_to_skip == [] else '#' + ' #'.join(surf for surf in cells_to_skip)
-        cell = f'cell block_{block_id}_{rod_type}_u 0 fill block_{block_id}_{rod_type}_u -block_{block_id}_{rod_type}_s {surfaces_to_skip_str}  {cells_to_skip_str}'
+    def build_rod_universe(self, block_id, rod_type, surfaces_to_skip=None, cells_to_skip=None):
+        surfaces_to_skip_str = ' '.join(surfaces_to_skip) if surfaces_to_skip else ''
+        cells_to_skip_str = '#' + ' #'.join(cells_to_skip) if cells_to_skip else ''
+        cell = self._ROD_UNIVERSE_TMPL.format(id=block_id, rod=rod_type, surfaces=surfaces_to_skip_str, cells=cells_to_skip_str)
         return cell
     
+    def _block_fragments(self, block_id, block):
+        """!
+        Banners and text of a single block, in the layout written by `write_pbr_core()`.
+        """
+        for print_type, region in block.items():
+            block_label = f'Block {block_id} {print_type}'
+            yield self._BANNER.format(block_label)
+            for region_name, region_print in region.items():
+                yield self._BANNER.format(f'{block_label} {region_name}')
+                yield region_print
+
+    def _part_fragments(self, parts):
+        """!
+        Banners and text of (label, text) core region parts, in the layout written by `write_pbr_core()`.
+        """
+        for label, text in parts:
+            yield self._BANNER.format(label)
+            yield text
+
+    def _iter_fragments(self):
+        """!
+        Banners and text of every block followed by every core region, in the order they are written to the core input.
+        """
+        for block_id, block in self._block_dict.items():
+            yield from self._block_fragments(block_id, block)
+        yield from self._part_fragments(self._reactor_parts)
+
     def write_pbr_core(self):
+        """!
+        Write the block and reactor geometry to `core_file_name` in `output_dir`. \n
+        Newline translation is disabled so the file is identical on every platform and the fragments go straight into a large write buffer.
+        """
         core_input = os.path.join(self.output_dir,self.core_file_name)
 
-        f = open(core_input, 'w')
-        for block_id, block in self._block_dict.items():
-            for print_type, region in block.items():
-                f.write(f'\n\n%%%%%%%%%%%%%%%%%%%%% Block {block_id} {print_type} %%%%%%%%%%%%%%%%%%%%%\n\n')
-                for region_name, region_print in region.items():
-                    f.write(f'\n\n%%%%%%%%%%%%%%%%%%%%% Block {block_id} {print_type} {region_name} %%%%%%%%%%%%%%%%%%%%%\n\n')
-                    f.write(region_print)
-
-        for region_name, region in self._reactor_dict.items():
-            for print_type, region in region.items():
-                f.write(f'\n\n%%%%%%%%%%%%%%%%%%%%% {region_name} {print_type} %%%%%%%%%%%%%%%%%%%%%\n\n')
-                f.write(region)
\ No newline at end of file
+        with self._open_input(core_input) as f:
+            f.writelines(self._iter_fragments())
+
+    def build_core_template(self):
+        """!
+        Build the whole core once and store it in `_core_template`, with a `${block_{id}_rod}` placeholder in place of the control or safety rod surface of each block. \n
+        Only the rod surfaces depend on `cr_insertion_depth` and `sr_insertion_depth`, so `render_pbr_core()` can then produce the core input for new insertion depths without rebuilding the rest of the geometry.
+        The core is built on scratch copies of `_block_dict` and `_reactor_parts`, so any geometry already built on this reactor is left untouched.
+        """
+        block_dict, reactor_parts = self._block_dict, self._reactor_parts
+        self._block_dict = {}
+        self._reactor_parts = []
+        try:
+            self.build_pbr_core()
+            # Escape the geometry text for string.Template before dropping in the rod placeholders
+            for block_id, block in self._block_dict.items():
+                for section in block.values():
+                    for name, text in section.items():
+                        section[name] = text.replace('$', '$$')
+                if 'control_rod' in block['surfaces']:
+                    block['surfaces']['control_rod'] = f'${{block_{block_id}_rod}}'
+            self._reactor_parts = [(label, text.replace('$', '$$')) for label, text in self._reactor_parts]
+            self._core_template = string.Template(''.join(self._iter_fragments()))
+            self._core_template_key = self._geometry_key()
+        finally:
+            self._block_dict, self._reactor_parts = block_dict, reactor_parts
+
+    def _geometry_key(self):
+        """!
+        Snapshot of every parameter the core template depends on, used to detect changes to the geometry after the template was built.
+        """
+        return repr([(name, value) for name, value in vars(self).items() if name not in self._TEMPLATE_EXCLUDED])
+
+    def render_pbr_core(self, cr_insertion_depth=None, sr_insertion_depth=None):
+        """!
+        Return the core input text (identical to the file written by `build_pbr_core()` and `write_pbr_core()`) for the given control and safety rod insertion depths. \n
+        Depths that are not given keep their current value. The template is built by `build_core_template()` on the first call and rebuilt whenever another parameter has changed since.
+        """
+        if cr_insertion_depth is not None:
+            self.cr_insertion_depth = cr_insertion_depth
+        if sr_insertion_depth is not None:
+            self.sr_insertion_depth = sr_insertion_depth
+        if self._core_template is None or self._core_template_key != self._geometry_key():
+            self.build_core_template()
+        if self.simple_core:
+            return self._core_template.substitute()
+
+        specs = self._block_specs(range(len(self._block_angles)), self._block_angles)
+        rods = {f'block_{block_id}_rod': self.build_rod_surfaces(block_id, self.radius_to_cr_center, self.control_rod_radius, angle, spec['rod_type'],
+                                                                  spec['rod_lower_height'], self.control_rod_upper_height, uv=spec['rod_uv'])[1]
+                for block_id, (angle, spec) in enumerate(zip(self._block_angles, specs))}
+        return self._core_template.substitute(rods)
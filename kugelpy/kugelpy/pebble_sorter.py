@@ -371,7 +371,7 @@ class PebbleSorter(SerpentReactor):
             if self.homogenize_passes: # If we homogenize the pass, we need to udpate the universe again to account for the homogenization
                 uni = f'f{new_pebble._homogenization_group}_' + '_'.join([f'c0v0' for n in range(0,new_pebble._num_passes)])
                 new_pebble.set_previous_universe(uni)
-                new_pebble._material['fuel'] = self._homogenized_materials_dict[new_pebble._num_passes][new_pebble._homogenization_group]['mats']
+                new_pebble.update_fuel_material(self._homogenized_materials_dict[new_pebble._num_passes][new_pebble._homogenization_group]['mats'])
             new_pebble.update_position(x, y, z, r, channel, volume, shuffled=True)    
         return new_pebble
         
@@ -814,7 +814,7 @@ class PebbleSorter(SerpentReactor):
         """
         dir_ = self.determine_data_path()
 
-        temp_dict = su.bu_reader(dir_)
+        temp_dict = su.bu_reader(dir_, as_arrays=True)
             
         for step_, step_dict in temp_dict.items():
             self._burnup_materials[step_] = {}
@@ -822,7 +822,7 @@ class PebbleSorter(SerpentReactor):
                 mat_split = mat.split('_')
                 material = ''.join([f'{mat_temp}_' for mat_temp in mat_split if 'c' in mat_temp])
                 material = mat_split[1] + '_' + material.split('p')[0]
-                self._burnup_materials[step_][material] = self.prune_burn_material(mat_dict)
+                self._burnup_materials[step_][material] = self.prune_burn_material_arrays(mat_dict)
            
     def read_burn_material_restart(self):
         """!
@@ -831,7 +831,7 @@ class PebbleSorter(SerpentReactor):
         start_step_path = os.path.join(self.output_dir, f'step_{self.start_step}')
         if not os.path.isdir(start_step_path):
             print('Error: Path to restart materials does not exist.')
-        temp_dict = su.bu_reader(start_step_path) 
+        temp_dict = su.bu_reader(start_step_path, as_arrays=True)
             
         for step, step_dict in temp_dict.items():
             self._burnup_materials[step] = {}
@@ -843,9 +843,9 @@ class PebbleSorter(SerpentReactor):
                 num_passes = len(material.split('_')) -  1# We subtract off 1 becuase the pebbles have not gone through the full pass yet, the last value is their current pass
 
                 if current_block in self._burnup_materials[step].keys():
-                    self._burnup_materials[step][current_block].append((num_passes, self.prune_burn_material(mat_dict)))
+                    self._burnup_materials[step][current_block].append((num_passes, self.prune_burn_material_arrays(mat_dict)))
                 else:
-                    self._burnup_materials[step][current_block] = [(num_passes, self.prune_burn_material(mat_dict))]
+                    self._burnup_materials[step][current_block] = [(num_passes, self.prune_burn_material_arrays(mat_dict))]
 
     def read_keff(self):
         """!
@@ -858,7 +858,8 @@ class PebbleSorter(SerpentReactor):
         path_serpent_output = os.path.join(dir_, f'{self.reactor_file_name}_res.m')
         k_name = 'COL_KEFF' if self.serpent_version == '2.2' else 'IMP_KEFF'
         keff = su.serpent_rd(path_serpent_output,[k_name],[x for x in range(0,total_steps)])
-        self.keff = np.array([float(x) for x in keff[k_name]])       
+        # serpent_rd returns the mean value of each step as a one element array
+        self.keff = np.fromiter((x[0] for x in keff[k_name]), dtype=np.float64, count=len(keff[k_name]))
                         
     def read_in_pebble_dist(self):
         """!
@@ -876,12 +877,14 @@ class PebbleSorter(SerpentReactor):
         
         self.pebble_mesh = self.pebble_dist.chanvolpart
         self._pebble_array = []
+        xv, yv, zv, pr = self.pebble_dist.xv, self.pebble_dist.yv, self.pebble_dist.zv, self.pebble_dist.pr
+        radii = self.convert_xy_to_r_vec(np.column_stack((xv, yv))).tolist()
         for channel_num, channel in enumerate(self.pebble_mesh):
             self._pebble_array.append([])
             for volume_num, volume in enumerate(channel):
                 self._pebble_array[channel_num].append([])
                 for peb_pos, pebble in enumerate(volume):
-                    x,y,z,r,pr = self.pebble_dist.xv[pebble], self.pebble_dist.yv[pebble], self.pebble_dist.zv[pebble], self.convert_xy_to_r(self.pebble_dist.xv[pebble], self.pebble_dist.yv[pebble]), self.pebble_dist.pr
+                    x,y,z,r = xv[pebble], yv[pebble], zv[pebble], radii[pebble]
                     fuel_temp, pebble_temp = self.get_temperature(channel_num,volume_num)
                     self._pebble_number += 1
                     if self.determine_pebble_type(self.graphite_height, self.graphite_fraction, z) == 'fuel':
@@ -949,8 +952,10 @@ class PebbleSorter(SerpentReactor):
                 reload_volume.append((channel_num, copy.copy(pebble)))
         random.shuffle(reload_volume)
 
+        xv, yv, zv, pr = self.pebble_dist.xv, self.pebble_dist.yv, self.pebble_dist.zv, self.pebble_dist.pr
+        radii = self.convert_xy_to_r_vec(np.column_stack((xv, yv))).tolist()
         for channel_num, pebble in reload_volume:
-            x,y,z,r,pr = self.pebble_dist.xv[pebble], self.pebble_dist.yv[pebble], self.pebble_dist.zv[pebble], self.convert_xy_to_r(self.pebble_dist.xv[pebble], self.pebble_dist.yv[pebble]), self.pebble_dist.pr
+            x,y,z,r = xv[pebble], yv[pebble], zv[pebble], radii[pebble]
             if len(self._unloaded_fuel_pebbles):
                 recycle_pebble = self._unloaded_fuel_pebbles.pop()
                 recycle_pebble.increase_pass()
@@ -981,9 +986,8 @@ class PebbleSorter(SerpentReactor):
         """!
         Set the cross-section set based on the temperature of the component.
         """
-        dict_array = np.array([x for x in self.xs_dict.keys()])
-        temp = dict_array[dict_array<temperature].max() if temperature not in self.xs_dict.keys() else temperature
-        return self.xs_dict[temp]['xs_set'], self.xs_dict[temp]['graphite']
+        xs = self.xs_dict[self._xs_temperature(temperature)]
+        return xs['xs_set'], xs['graphite']
 
     def setup_kernel(self, fuel_radius=0.02125, buffer_radius=0.03125, inner_pyc_radius=0.03525, sic_radius=0.03875, outer_pyc_radius=0.04275, kernels_per_pebble=18687):
         """!
@@ -1204,12 +1208,12 @@ class PebbleSorter(SerpentReactor):
         peb_type = pebble._pebble_type
         univ = pebble._universe
         if peb_type == 'graphite':
-            f.write(f'cell pebble_{univ} {univ} matrix_{univ} -pebble_inner\n')
-            f.write(f'cell shell_{univ} {univ} pebshell_{univ} pebble_inner -pebble_outer\n')
+            self.write_section(f, f'cell pebble_{univ} {univ} matrix_{univ} -pebble_inner\n',
+                                  f'cell shell_{univ} {univ} pebshell_{univ} pebble_inner -pebble_outer\n')
         else:
-            f.write(f'cell pebble_{univ} {univ} fill triso_{univ} -pebble_inner\n')
-            f.write(f'cell matrix_c{univ} matrix_u{univ} matrix_{univ} -inf_surf\n')
-            f.write(f'cell pebble_{univ}_matrix {univ} pebshell_{univ} pebble_inner -pebble_outer\n')
+            self.write_section(f, f'cell pebble_{univ} {univ} fill triso_{univ} -pebble_inner\n',
+                                  f'cell matrix_c{univ} matrix_u{univ} matrix_{univ} -inf_surf\n',
+                                  f'cell pebble_{univ}_matrix {univ} pebshell_{univ} pebble_inner -pebble_outer\n')
 
     def create_pebble_detectors(self,pebble):
         """!
@@ -1255,17 +1259,13 @@ class PebbleSorter(SerpentReactor):
             if 'fuel' in mat:
                 f.write(f'mat {mat}_{u} sum tmp {pebble._fuel_temperature} vol {volume} burn 1\n')
             elif mat in ['inner_pyc', 'outer_pyc', 'pebshell']:
-                f.write(f'mat {mat}_{u} sum tmp {pebble._temperature} vol {volume} moder {pebble._scattering_library} 6000\n')               
+                f.write(f'mat {mat}_{u} sum tmp {pebble._temperature} vol {volume} moder {pebble.scattering_library} 6000\n')               
             else:
                 f.write(f'mat {mat}_{u} sum tmp {pebble._temperature} vol {volume}\n')
                 
             self.pebble_material_volume_data[u][mat] = {'volume': volume, 'atom_densities': mat_dict}
-            for elem, atom_den in mat_dict.items():
-                if 'volume' not in elem:
-                    if 'fuel' in mat:
-                        f.write(f'  {elem}.{pebble._xs_fuel_library}      {atom_den:e}\n')
-                    else:
-                        f.write(f'  {elem}.{pebble._xs_library}      {atom_den:e}\n')       
+            xs_library = pebble.xs_fuel_library if 'fuel' in mat else pebble.xs_library
+            self.write_section(f, *[f'  {elem}.{xs_library}      {atom_den:e}\n' for elem, atom_den in mat_dict.items() if 'volume' not in elem])
 
     def write_pebble_data(self):
         """!
@@ -1278,13 +1278,13 @@ class PebbleSorter(SerpentReactor):
         detector_input = os.path.join(self.output_dir,self.detector_file)
         self.pebble_material_volume_data = {}
 
-        f1 = open(pebble_surface_input, 'w')
+        f1 = self._open_input(pebble_surface_input)
         f1.write('%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%\n%%% Pebble Surfaces\n%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%\n')
-        f2 = open(pebble_material_input, 'w')
+        f2 = self._open_input(pebble_material_input)
         f2.write('%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%\n%%% Pebble Materials\n%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%\n')
-        f3 = open(pebble_cell_input, 'w')
+        f3 = self._open_input(pebble_cell_input)
         f3.write('%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%\n%%% Pebble Cells\n%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%\n')
-        f4 = open(detector_input, 'w')
+        f4 = self._open_input(detector_input)
         f4.write('%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%\n%%% Pebble Detectors\n%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%\n')
         pebble_list = []
         pebble_number = 1
@@ -1327,7 +1327,7 @@ class PebbleSorter(SerpentReactor):
 
         pebble_input_path = os.path.join(self.output_dir,self._step_pebble_distribution_file)
 
-        f = open(pebble_input_path, 'w')
+        f = self._open_input(pebble_input_path)
         for channel_num, channel in enumerate(self._pebble_array):
             for volume_num, volume in enumerate(channel):
                 for peb_pos, pebble in enumerate(volume):
@@ -1347,7 +1347,7 @@ class PebbleSorter(SerpentReactor):
         """
 
         serpent_input_path = os.path.join(self.output_dir,self.reactor_file_name)
-        f = open(serpent_input_path, 'w')
+        f = self._open_input(serpent_input_path)
 
         f.write('% Created by pebble_sorter found at: https://github.inl.gov/reactor-multiphysics/pyrates\n% Contact a member of the Griffin team for access.\n\n')
         for file_name in [self.pebble_surface_file, self.pebble_material_file, self.pebble_cell_file, self.pbr_core.core_file_name, self.detector_file, 'materials.inp']:
@@ -1385,7 +1385,7 @@ class PebbleSorter(SerpentReactor):
 
     def write_materials_file(self):
         file_path = os.path.join(self.output_dir, 'materials.inp')
-        with open(file_path, 'w') as f:
+        with self._open_input(file_path) as f:
             for material, mat_dict in self.core_materials.items():
                 xs, scat = self.set_xs_set(mat_dict['temperature'])
                 scat = '' if mat_dict["moder"] == '' else scat
@@ -9,9 +9,10 @@ import os
 from re import sub
 import numpy as np
 
-def bu_reader(path_to_bu):
+def bu_reader(path_to_bu, as_arrays=False):
     '''
     Given a file directory, grab each `bumat` file and return a dictionary based on the burnup step and pebble compositions
+    With `as_arrays` the compositions are returned as arrays, see `nuclide_loop`
     '''
     files = [x[2] for x in os.walk(path_to_bu)]
     pebble_dict = {}
@@ -20,13 +21,15 @@ def bu_reader(path_to_bu):
             #time is denotes by `bumat#`, where the # gives the time step
             time = file_name.split('bumat')
             time = int(time[-1])
-            a_dens = nuclide_loop(path_to_bu, file_name)
+            a_dens = nuclide_loop(path_to_bu, file_name, as_arrays)
             pebble_dict[time] = a_dens
     return pebble_dict
 
-def nuclide_loop(path_to_bu, file_name):
+def nuclide_loop(path_to_bu, file_name, as_arrays=False):
     '''
     Extract the atom densities for each pebble   
+    With `as_arrays` each material maps to {'volume': volume, 'nuclides': array of nuclide strings, 'a_dens': array of atom densities},
+    so the compositions can be filtered before any per-nuclide dictionary is built
     '''
     f = open(f'{path_to_bu}/{file_name}', "r")
     nuclide_dict = {}
@@ -37,11 +40,22 @@ def nuclide_loop(path_to_bu, file_name):
             mat, a_density, volume = line.split('  ')[1], float(line.split(' ')[-3]), float(line.split(' ')[-1])
             nuclide_dict[mat] = {}
             nuclide_dict[mat]['volume'] = volume
+            if as_arrays:
+                nuclide_dict[mat]['nuclides'] = []
+                nuclide_dict[mat]['a_dens'] = []
         elif correct_lines:
             nuclide, a_den = read_nuclide_atom_density(line)
-            nuclide_dict[mat][nuclide] = a_den
+            if as_arrays:
+                nuclide_dict[mat]['nuclides'].append(nuclide)
+                nuclide_dict[mat]['a_dens'].append(a_den)
+            else:
+                nuclide_dict[mat][nuclide] = a_den
             
     f.close()  
+    if as_arrays:
+        for mat_dict in nuclide_dict.values():
+            mat_dict['nuclides'] = np.array(mat_dict['nuclides'], dtype=str)
+            mat_dict['a_dens'] = np.array(mat_dict['a_dens'], dtype=float)
     return nuclide_dict
 
 def read_nuclide_atom_density(line):
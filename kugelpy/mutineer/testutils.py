@@ -116,6 +116,17 @@ def compare_pbeds(solution_file, solution_path, test_file, test_path, solution_s
         
         return True
 
+def slot_vars(obj):
+    '''
+    Equivalent of `vars()` for objects whose attributes are stored in `__slots__`.
+    Attributes are returned in slot order, base class first; unset slots are skipped.
+
+    obj: (object) instance of a class defining `__slots__`
+    '''
+    return {name: getattr(obj, name) for cls in reversed(type(obj).__mro__)
+                                     for name in getattr(cls, '__slots__', ())
+                                     if hasattr(obj, name)}
+
 #===============================================================================
 # Main
 #===============================================================================
@@ -108,7 +108,10 @@ Copyright 2024, Battelle Energy Alliance, LLC, ALL RIGHTS RESERVED
 # - pickle
 # - math
 # - random
-# - operator
+# - functools
+# - bisect
+# - subprocess
+# - struct
 #
 # @section author_reactor Author(s)
 # - Created by Ryan Stewart and Paolo Balestra
@@ -122,7 +125,73 @@ import shutil
 import pickle
 import math
 import random 
-import operator
+import functools
+import bisect
+import subprocess
+import struct
+
+# Random token pairing a savepoint pickle with its .buffers side file
+_SAVE_TOKEN_SIZE = 16
+
+
+def _cylv_body(radius, lower_height, upper_height, x_offset, y_offset, z_offset, u, v, w):
+    return f'cylv {x_offset} {y_offset} {z_offset} {u} {v} {w} {radius}\n'
+
+def _cylz_body(radius, lower_height, upper_height, x_offset, y_offset, z_offset, u, v, w):
+    return f'cylz {x_offset} {y_offset} {radius} {lower_height} {upper_height}\n'
+
+def _cyly_body(radius, lower_height, upper_height, x_offset, y_offset, z_offset, u, v, w):
+    return f'cyly {x_offset} {z_offset} {radius} {lower_height} {upper_height}\n'
+
+def _cylx_body(radius, lower_height, upper_height, x_offset, y_offset, z_offset, u, v, w):
+    return f'cylx {y_offset} {z_offset} {radius} {lower_height} {upper_height}\n'
+
+## Cylinder surface card builders by Serpent surface type.
+_CYL_BUILDERS = {'cylv': _cylv_body, 'cylz': _cylz_body, 'cyly': _cyly_body, 'cylx': _cylx_body}
+
+@functools.lru_cache(maxsize=4096, typed=True)
+def _cylinder_surface_body(cyl_type, radius, lower_height, upper_height, x_offset, y_offset, z_offset, u, v, w):
+    """!
+    Type and parameters of a cylinder surface card (everything after the surface name). \n
+    The same cylinders are declared by many regions of the core, so the formatted text is cached.
+    """
+    try:
+        builder = _CYL_BUILDERS[cyl_type]
+    except (KeyError, TypeError):
+        raise ValueError(f"Unknown cylinder surface type {cyl_type}, please select from 'cylv', 'cylx', 'cyly', 'cylz'") from None
+    # Fixed five decimals give the same values as rounding to five places, without the shortest-repr search
+    radius = f'{float(radius):.5f}'
+    lower_height = f'{float(lower_height):.5f}' if lower_height != '' else ''
+    upper_height = f'{float(upper_height):.5f}' if upper_height != '' else ''
+    return builder(radius, lower_height, upper_height, x_offset, y_offset, z_offset, u, v, w)
+
+@functools.lru_cache(maxsize=1024)
+def _detector_binning(energy_bins, axial_variation, cylindrical_variation):
+    """!
+    Energy, axial and cylindrical binning fragment of a detector card. \n
+    Detectors in large cores tend to share their binning, so the fragment is built once per unique (energy_bins, axial_variation, cylindrical_variation).
+    `cylindrical_variation` is given as (r, theta, z) tuples of three values each.
+    """
+    parts = []
+    if energy_bins:
+        parts.append(f'de {energy_bins} ')
+    if axial_variation:
+        parts.append(f'dz {" ".join(map(str, axial_variation))}')
+    if cylindrical_variation:
+        parts.append('dn 1 ')
+        parts.extend(f'{value} ' for values in cylindrical_variation for value in values)
+    return ''.join(parts)
+
+@functools.lru_cache(maxsize=256)
+def _xs_temperature_for(temperature, sorted_xs_temps):
+    """!
+    Highest temperature in the sorted `xs_dict` temperatures that does not exceed the temperature. \n
+    Component temperatures repeat a lot, so the lookup is cached; the sorted temperatures are part of the key, so changing `xs_dict` needs no invalidation.
+    """
+    index = bisect.bisect_right(sorted_xs_temps, temperature) - 1
+    if index < 0:
+        raise ValueError(f'Temperature {temperature} K is below the lowest cross-section set temperature in xs_dict')
+    return sorted_xs_temps[index]
 
 
 class SerpentReactor(object):
@@ -172,6 +241,8 @@ class SerpentReactor(object):
         ## Stores user-made detector data \n
         ## Updated using `SerpentReactor.create_user_detector()`.
         self.user_detector_dict = {}
+        ## Size in bytes of the write buffer of the generated Serpent input files (see `SerpentReactor._open_input()`).
+        self.write_buffer_size = 1<<20
         ## Stores energy grids which can be used in detectors \n
         ## Updated using `SerpentReactor.create_energy_grid`.
         self.energy_grid_dict = {}
@@ -188,52 +259,50 @@ class SerpentReactor(object):
         """!
         Create the input file string for the pin 
         """
-        pin_str = '% ----- Fuel Pin\n\n'
-        pin_str += f'pin {pin_name}\n'
-        for k,v in pin_dict.items():
-            pin_str += f"{v['mat']} {v['radius']}\n"
-        return pin_str
+        parts = ['% ----- Fuel Pin\n\n', f'pin {pin_name}\n']
+        parts.extend(f"{v['mat']} {v['radius']}\n" for v in pin_dict.values())
+        return ''.join(parts)
+
+    def _open_input(self, path):
+        """!
+        Open a generated Serpent input file for writing with a `write_buffer_size` buffer, so the many small writes of the input builders reach the disk in large blocks.
+        """
+        return open(os.fspath(path), 'w', buffering=self.write_buffer_size, newline='\n')
+
+    def write_section(self, f, *parts):
+        """!
+        Write the parts of a logical section of an input file with a single call.
+        """
+        f.write(''.join(parts))
 
     def build_cylinder_surface(self, surface_name, cyl_type, radius, lower_height='', upper_height='', x_offset=0.0, y_offset=0.0, z_offset=0.0, u=0.0, v=0.0, w=0.0):
-        radius = round(float(radius),5)
-        lower_height = round(float(lower_height),5) if lower_height != '' else ''
-        upper_height = round(float(upper_height),5) if upper_height != '' else ''
-        if cyl_type == 'cylv':
-            return f'surf {surface_name} {cyl_type} {x_offset} {y_offset} {z_offset} {u} {v} {w} {radius}\n'
-        elif cyl_type == 'cylz':
-            return f'surf {surface_name} {cyl_type} {x_offset} {y_offset} {radius} {lower_height} {upper_height}\n'
-        elif cyl_type == 'cyly':
-            return f'surf {surface_name} {cyl_type} {x_offset} {z_offset} {radius} {lower_height} {upper_height}\n'
-        elif cyl_type == 'cylx':
-            return f'surf {surface_name} {cyl_type} {y_offset} {z_offset} {radius} {lower_height} {upper_height}\n'
-        else:
-            raise ValueError(f"Unknown cylinder surface type {cyl_type}, please select from 'cylv', 'cylx', 'cyly', 'cylz'")
+        return f'surf {surface_name} ' + _cylinder_surface_body(cyl_type, radius, lower_height, upper_height, x_offset, y_offset, z_offset, u, v, w)
     
     def build_cuboid_surface(self, surface_name, lower_x, upper_x, lower_y, upper_y, lower_z, upper_z):
         return f'surf {surface_name} cuboid {lower_x} {upper_x} {lower_y} {upper_y} {lower_z} {upper_z}\n'
 
-    def build_cell(self, cell_name, universe_name, material, inside_surfaces=[], outside_surfaces=[], outside_cells=[]):  
-        i_surfaces = '-' + ' -'.join([x for x in inside_surfaces]) if inside_surfaces else ''
-        o_surfaces = ' '.join([x for x in outside_surfaces])
-        o_cell = '' if len(outside_cells) == 0 else '#' + ' #'.join([x for x in outside_cells])
+    def build_cell(self, cell_name, universe_name, material, inside_surfaces=None, outside_surfaces=None, outside_cells=None):
+        i_surfaces = '-' + ' -'.join(inside_surfaces) if inside_surfaces else ''
+        o_surfaces = ' '.join(outside_surfaces or ())
+        o_cell = '#' + ' #'.join(outside_cells) if outside_cells else ''
         return f'cell {cell_name} {universe_name} {material} {i_surfaces} {o_surfaces} {o_cell}\n'
 
-    def build_filled_universe(self, cell_universe_name, fill_universe, inside_surfaces=[], outside_surfaces=[], outside_cells=[]):  
-        i_surfaces = '-' + ' -'.join([x for x in inside_surfaces])
-        o_surfaces = ' '.join([x for x in outside_surfaces])
-        o_cell = '' if len(outside_cells) == 0 else '#' + ' #'.join([x for x in outside_cells])
+    def build_filled_universe(self, cell_universe_name, fill_universe, inside_surfaces=None, outside_surfaces=None, outside_cells=None):
+        i_surfaces = '-' + ' -'.join(inside_surfaces or ())
+        o_surfaces = ' '.join(outside_surfaces or ())
+        o_cell = '#' + ' #'.join(outside_cells) if outside_cells else ''
         return f'cell {cell_universe_name} {fill_universe} fill {cell_universe_name} {i_surfaces} {o_surfaces} {o_cell}\n'
 
-    def build_universe(self, cell_universe_name, inside_surfaces=[], outside_surfaces=[], outside_cells=[]):  
-        i_surfaces = '-' + ' -'.join([x for x in inside_surfaces])
-        o_surfaces = ' '.join([x for x in outside_surfaces])
-        o_cell = '' if len(outside_cells) == 0 else '#' + ' #'.join([x for x in outside_cells])
+    def build_universe(self, cell_universe_name, inside_surfaces=None, outside_surfaces=None, outside_cells=None):
+        i_surfaces = '-' + ' -'.join(inside_surfaces or ())
+        o_surfaces = ' '.join(outside_surfaces or ())
+        o_cell = '#' + ' #'.join(outside_cells) if outside_cells else ''
         return f'cell {cell_universe_name} 0 fill {cell_universe_name} {i_surfaces} {o_surfaces} {o_cell}\n'
 
-    def build_filled_cell(self, cell_name, universe_name, material, inside_surfaces=[], outside_surfaces=[], outside_cells=[]):  
-        i_surfaces = '-' + ' -'.join([x for x in inside_surfaces]) if inside_surfaces else ''
-        o_surfaces = ' '.join([x for x in outside_surfaces])
-        o_cell = '' if len(outside_cells) == 0 else '#' + ' #'.join([x for x in outside_cells])
+    def build_filled_cell(self, cell_name, universe_name, material, inside_surfaces=None, outside_surfaces=None, outside_cells=None):
+        i_surfaces = '-' + ' -'.join(inside_surfaces) if inside_surfaces else ''
+        o_surfaces = ' '.join(outside_surfaces or ())
+        o_cell = '#' + ' #'.join(outside_cells) if outside_cells else ''
         return f'cell {cell_name} {universe_name} fill {material} {i_surfaces} {o_surfaces} {o_cell}\n'
 
     def build_plane_surface(self, surf_name, plane_orientation, position):
@@ -242,15 +311,66 @@ class SerpentReactor(object):
     def convert_theta_to_uv(self, theta, r=1):
         return (r*math.sin(theta), r*math.cos(theta))
 
+    def convert_thetas_to_uv(self, thetas, r=1.0):
+        """!
+        Vectorized `convert_theta_to_uv()`, returns an (N,2) array of (u, v) for an array of angles in radians.
+        """
+        thetas = np.asarray(thetas, dtype=np.float64)
+        return np.stack([r*np.sin(thetas), r*np.cos(thetas)], axis=-1)
+
     def prune_burn_material(self, mat_dict):
         """!
         Remove materials in the BU file that have an atom density less than the user-defined limit
         """
-        pruned_mat_dict = {}
-        for isotope, a_dens in mat_dict.items():
-            if a_dens > self.atom_density_limit:
-                pruned_mat_dict[isotope] = a_dens
-        return pruned_mat_dict  
+        atom_density_limit = self.atom_density_limit
+        return {isotope: a_dens for isotope, a_dens in mat_dict.items() if a_dens > atom_density_limit}
+
+    def prune_burn_arrays(self, nuclides, a_dens):
+        """!
+        Array counterpart of `prune_burn_material()` for compositions stored as parallel nuclide and atom density arrays \n
+        Returns the nuclides and atom densities above the user-defined limit, filtered with a single boolean mask.
+        """
+        a_dens = np.asarray(a_dens, dtype=np.float64)
+        mask = a_dens > self.atom_density_limit
+        return np.asarray(nuclides)[mask], a_dens[mask]
+
+    def prune_burn_material_arrays(self, mat_arrays):
+        """!
+        Build the pruned burnup material from a composition read with `bu_reader(..., as_arrays=True)` \n
+        Gives the same dictionary as `prune_burn_material()` on the dictionary form, but only the nuclides above the limit are ever inserted.
+        """
+        nuclides, a_dens = self.prune_burn_arrays(mat_arrays['nuclides'], mat_arrays['a_dens'])
+        burn_material = {'volume': mat_arrays['volume']} if mat_arrays['volume'] > self.atom_density_limit else {}
+        burn_material.update(zip(nuclides.tolist(), a_dens.tolist()))
+        return burn_material
+
+    @property
+    def xs_dict(self):
+        """!
+        Cross-section data keyed by temperature; assigning a new dictionary also refreshes the sorted temperatures used by `set_xs_set()`.
+        """
+        return self._xs_dict
+
+    @xs_dict.setter
+    def xs_dict(self, xs_dict):
+        self._xs_dict = xs_dict
+        self._sorted_xs_temps = tuple(sorted(xs_dict))
+
+    def __setstate__(self, state):
+        # Save points written before xs_dict became a property store it as a plain attribute
+        if 'xs_dict' in state:
+            xs_dict = state.pop('xs_dict')
+            state['_xs_dict'], state['_sorted_xs_temps'] = xs_dict, tuple(sorted(xs_dict))
+        self.__dict__.update(state)
+
+    def _xs_temperature(self, temperature):
+        """!
+        Highest temperature in `xs_dict` that does not exceed the temperature of the component.
+        """
+        # Entries added to xs_dict in place bypass the setter
+        if len(self._sorted_xs_temps) != len(self._xs_dict):
+            self._sorted_xs_temps = tuple(sorted(self._xs_dict))
+        return _xs_temperature_for(temperature, self._sorted_xs_temps)
 
     def set_xs_set(self, temperature):
         """!
@@ -258,10 +378,7 @@ class SerpentReactor(object):
         """
         if temperature < 294:
             return self.xs_dict[0]['xs_set']
-        else:
-            dict_array = np.array([x for x in self.xs_dict.keys()])
-            temp = dict_array[dict_array<temperature].max() if temperature not in self.xs_dict.keys() else temperature
-        return self.xs_dict[temp]['xs_set']
+        return self.xs_dict[self._xs_temperature(temperature)]['xs_set']
         
     def create_geom_plot(self, ptype, xpix, ypix, pos=None, min1=None, max1=None, min2=None, max2=None):
         """!
@@ -282,14 +399,12 @@ class SerpentReactor(object):
         energy_grid = {'type': type,
                        'boundaries': boundaries}
         
-        energy_grid_str = f'ene {name} {energy_grid["type"] }'
-        energy_grid_str += f' {" ".join([str(boundary) for boundary in energy_grid["boundaries"]])}'
-        energy_grid_str += '\n'
+        energy_grid_str = f'ene {name} {energy_grid["type"] } {" ".join(map(str, energy_grid["boundaries"]))}\n'
         self.energy_grid_dict[name] = {'energy_grid':energy_grid, 'energy_grid_str':energy_grid_str}
 
-    def create_detector(self, name, particle_type='n', energy_bins=None, surface=None, direction=None, cell=None, universe=None, materials=None, responses=None, micro_xs=True, axial_variation=None, cylindrical_variation=None):
+    def _build_detector_str(self, name, particle_type, energy_bins, surface, direction, cell, universe, materials, responses, micro_xs, axial_variation, cylindrical_variation):
         '''!
-        For formatting of detector elements, see Serpent documentation
+        Build the detector data and the Serpent detector card shared by `create_detector()` and `create_user_detector()`
         '''
         detector = {'surface':       surface,
                     'cell':          cell,
@@ -301,66 +416,40 @@ class SerpentReactor(object):
                     'cylindrical_variation': cylindrical_variation
                     }
                     
-        det_str = f'det {name} {particle_type} '
-        det_str += f'ds {surface} {direction} ' if surface else ''
-        det_str += f'dc {cell} ' if cell else ''
-        det_str += f'du {universe} ' if universe else ''
-        det_str += f'de {energy_bins} ' if energy_bins else ''
-        det_str += f'dz {" ".join([str(x) for x in axial_variation])}' if axial_variation else ''
+        parts = [f'det {name} {particle_type} ']
+        if surface:
+            parts.append(f'ds {surface} {direction} ')
+        if cell:
+            parts.append(f'dc {cell} ')
+        if universe:
+            parts.append(f'du {universe} ')
         if cylindrical_variation:
-            det_str += f'dn 1 '
-            for key in ['r', 'theta', 'z']:
-                for index in range(3):
-                    det_str += f'{str(cylindrical_variation[key][index])} '
+            cylindrical_variation = tuple(tuple(cylindrical_variation[key][:3]) for key in ['r', 'theta', 'z'])
+        parts.append(_detector_binning(energy_bins, tuple(axial_variation) if axial_variation else None, cylindrical_variation))
 
         if materials and micro_xs:
             assert len(materials) == len(responses)
-            for mat, rr in zip(materials, responses):
-                det_str += f'dr {rr} {mat} '
+            parts.extend(f'dr {rr} {mat} ' for mat, rr in zip(materials, responses))
         elif materials:
             assert len(materials) == len(responses)
-            for mat, rr in zip(materials, responses):
-                det_str += f'dr {rr} void dm {mat}'
-        det_str += '\n'
-        self._detector_dict[name] = {'detector': detector, 'detector_str': det_str}    
-    
-    def create_user_detector(self, name, particle_type='n', energy_bins=None, surface=None, direction=None, cell=None, universe=None, materials=None, responses=None, micro_xs=True, axial_variation=None, cylindrical_variation=None):
+            parts.extend(f'dr {rr} void dm {mat}' for mat, rr in zip(materials, responses))
+        parts.append('\n')
+        det_str = ''.join(parts)
+        return detector, det_str
+
+    def create_detector(self, name, particle_type='n', energy_bins=None, surface=None, direction=None, cell=None, universe=None, materials=None, responses=None, micro_xs=True, axial_variation=None, cylindrical_variation=None):
         '''!
         For formatting of detector elements, see Serpent documentation
         '''
-        detector = {'surface':       surface,
-                    'cell':          cell,
-                    'universe':      universe,
-                    'energy_bins':   energy_bins,
-                    'materials':     materials,
-                    'reaction_rate': responses,
-                    'axial_variation': axial_variation,
-                    'cylindrical_variation': cylindrical_variation
-                    }
-                    
-        det_str = f'det {name} {particle_type} '
-        det_str += f'ds {surface} {direction} ' if surface else ''
-        det_str += f'dc {cell} ' if cell else ''
-        det_str += f'du {universe} ' if universe else ''
-        det_str += f'de {energy_bins} ' if energy_bins else ''
-        det_str += f'dz {" ".join([str(x) for x in axial_variation])}' if axial_variation else ''
-        if cylindrical_variation:
-            det_str += f'dn 1 '
-            for key in ['r', 'theta', 'z']:
-                for index in range(3):
-                    det_str += f'{str(cylindrical_variation[key][index])} '
+        detector, det_str = self._build_detector_str(name, particle_type, energy_bins, surface, direction, cell, universe, materials, responses, micro_xs, axial_variation, cylindrical_variation)
+        self._detector_dict[name] = {'detector': detector, 'detector_str': det_str}
 
-        if materials and micro_xs:
-            assert len(materials) == len(responses)
-            for mat, rr in zip(materials, responses):
-                det_str += f'dr {rr} {mat} '
-        elif materials:
-            assert len(materials) == len(responses)
-            for mat, rr in zip(materials, responses):
-                det_str += f'dr {rr} void dm {mat}'
-        det_str += '\n'
-        self.user_detector_dict[name] = {'detector': detector, 'detector_str': det_str}    
-        
+    def create_user_detector(self, name, particle_type='n', energy_bins=None, surface=None, direction=None, cell=None, universe=None, materials=None, responses=None, micro_xs=True, axial_variation=None, cylindrical_variation=None):
+        '''!
+        For formatting of detector elements, see Serpent documentation
+        '''
+        detector, det_str = self._build_detector_str(name, particle_type, energy_bins, surface, direction, cell, universe, materials, responses, micro_xs, axial_variation, cylindrical_variation)
+        self.user_detector_dict[name] = {'detector': detector, 'detector_str': det_str}
 
     def keep_solutions(self, step):
         """!
@@ -370,30 +459,28 @@ class SerpentReactor(object):
 
         if not os.path.isdir(solution_path):
             os.mkdir(solution_path)
-        for file in os.listdir(self.output_dir):
-            if os.path.isfile(os.path.join(self.output_dir,file)) and file != 'reactor_status.csv' and 'run_des' not in file:
-                old_file_path = os.path.join(self.output_dir, file)
-                new_file_path = os.path.join(solution_path, file)
-                shutil.move(old_file_path, new_file_path)  
+        with os.scandir(self.output_dir) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.name != 'reactor_status.csv' and 'run_des' not in entry.name:
+                    new_file_path = os.path.join(solution_path, entry.name)
+                    try:
+                        os.rename(entry.path, new_file_path)
+                    except OSError:
+                        # e.g. the step directory is on another device
+                        shutil.move(entry.path, new_file_path)
 
     def run_serpent(self, step):
         """!
         Submit a serpent job to the HPC and wait for the results
         """
-        cwd = os.getcwd()
-        os.chdir(self.output_dir)
         if self.one_run:
             print(f'Starting Step {step}')
-            if self.nofatal:
-                os.system(f'mpiexec sss2 {self.reactor_file_name} -nofatal -omp {self.num_threads}')
-            else:
-                os.system(f'mpiexec sss2 {self.reactor_file_name} -omp {self.num_threads}')
-
+            cmd = ['mpiexec', 'sss2', self.reactor_file_name] + (['-nofatal'] if self.nofatal else []) + ['-omp', str(self.num_threads)]
         else:
             print(f'Starting {step}')
-            os.system('qsub -W block=true serpent.pbs')
-        
-        os.chdir(cwd)
+            cmd = ['qsub', '-W', 'block=true', 'serpent.pbs']
+        # Run in output_dir without changing the working directory of the Python process
+        subprocess.run(cmd, cwd=self.output_dir, check=True)
 
     def plot_serpent(self):
         """!
@@ -404,12 +491,8 @@ class SerpentReactor(object):
         self.read_in_pebble_dist()
         self.setup_core()
 
-        cwd = os.getcwd()
-        os.chdir(self.output_dir)
         if self.one_run:
-            os.system(f'mpiexec sss2 {self.reactor_file_name} -nofatal -plot -omp 40')
-        
-        os.chdir(cwd)
+            subprocess.run(['mpiexec', 'sss2', self.reactor_file_name, '-nofatal', '-plot', '-omp', '40'], cwd=self.output_dir, check=True)
 
 
     def save(self, step):
@@ -420,19 +503,56 @@ class SerpentReactor(object):
         step_path = os.path.join(self.output_dir, f'step_{step}/')
         dir_ = step_path if os.path.isdir(step_path) else self.output_dir       
         file_name = os.path.join(dir_, f'savepoint_step{step}.pkl')
-        file = open(file_name, 'wb')
-        pickle.dump(self,file,2)
+        # Array data is handed over out-of-band and written straight from its memory to a side file, which only exists if there are such buffers
+        # Both files are written under temporary names and moved into place; a random token trailing the pickle and leading the side file pairs them
+        buffers = []
+        token = os.urandom(_SAVE_TOKEN_SIZE)
+        with open(f'{file_name}.tmp', 'wb') as file:
+            pickle.dump(self, file, protocol=5, buffer_callback=buffers.append)
+            if buffers:
+                file.write(token)
+        if buffers:
+            with open(f'{file_name}.buffers.tmp', 'wb') as file:
+                file.write(token)
+                file.write(struct.pack('<Q', len(buffers)))
+                for buffer in buffers:
+                    raw = buffer.raw()
+                    file.write(struct.pack('<Q', raw.nbytes))
+                    file.write(raw)
+            os.replace(f'{file_name}.buffers.tmp', f'{file_name}.buffers')
+        elif os.path.isfile(f'{file_name}.buffers'):
+            os.remove(f'{file_name}.buffers')
+        os.replace(f'{file_name}.tmp', file_name)
 
     @classmethod
     def loader(cls,output_dir,step):
         """!
-        Load the pickled save point and return the class.
+        Load the pickled save point and return the class. \n
+        The `.buffers` side file is only read when `save()` wrote it together with this pickle; a stale side file is ignored.
         """
         step_path = os.path.join(output_dir, f'step_{step}/')
         dir_ = step_path if os.path.isdir(step_path) else output_dir 
         file_name = os.path.join(dir_, f'savepoint_step{step}.pkl')
-        file = open(file_name, 'rb')
-        return pickle.load(file)
+        buffers = None
+        if os.path.isfile(f'{file_name}.buffers'):
+            with open(file_name, 'rb') as file:
+                file.seek(max(os.path.getsize(file_name) - _SAVE_TOKEN_SIZE, 0))
+                token = file.read()
+            with open(f'{file_name}.buffers', 'rb') as file:
+                if file.read(_SAVE_TOKEN_SIZE) == token:
+                    (num_buffers,) = struct.unpack('<Q', file.read(8))
+                    buffers = []
+                    for _ in range(num_buffers):
+                        (nbytes,) = struct.unpack('<Q', file.read(8))
+                        # bytearray keeps the restored arrays writeable
+                        buffer = bytearray(nbytes)
+                        file.readinto(buffer)
+                        buffers.append(buffer)
+        with open(file_name, 'rb') as file:
+            try:
+                return pickle.load(file, buffers=buffers)
+            except pickle.UnpicklingError as error:
+                raise ValueError(f'{file_name} does not match its .buffers side file; the save point is incomplete') from error
     
     def set_random_seed(self, seed):
         """!
@@ -440,25 +560,47 @@ class SerpentReactor(object):
         """
         self.random_seed = seed
         random.seed(seed)
+        self._rng = np.random.default_rng(seed)
+
+    @property
+    def rng(self):
+        """!
+        Seeded numpy Generator for drawing whole arrays of random numbers at once.
+        Created from `random_seed` on first use if `set_random_seed()` has not been called; the `random` module stays seeded for the existing scalar draws.
+        """
+        if '_rng' not in self.__dict__:
+            self._rng = np.random.default_rng(getattr(self, 'random_seed', None))
+        return self._rng
     
     def combine_dicts(self, a, b):   
         """!
         Combine two dictionaries and add common values
         """
-        return {**a, **b, **{k: operator.add(a[k], b[k]) for k in a.keys() & b}}
+        combined = dict(a)
+        for k, v in b.items():
+            combined[k] = combined[k] + v if k in combined else v
+        return combined
+
+    def combine_burn_arrays(self, nuclides_a, a_dens_a, nuclides_b, a_dens_b):
+        """!
+        Array counterpart of `combine_dicts()` for compositions stored as parallel nuclide and atom density arrays \n
+        Returns the sorted union of the nuclides and the summed atom densities.
+        """
+        nuclides = np.union1d(nuclides_a, nuclides_b)
+        a_dens = np.zeros(len(nuclides), dtype=np.float64)
+        np.add.at(a_dens, np.searchsorted(nuclides, nuclides_a), a_dens_a)
+        np.add.at(a_dens, np.searchsorted(nuclides, nuclides_b), a_dens_b)
+        return nuclides, a_dens
         
     def convert_xy_to_r(self, x, y):
         """!
         Calculate the radius of the RZ system based on the XY coordinates.
         """
-        return math.sqrt(pow(x, 2) + pow(y, 2))
-    
-    def prune_burn_material(self, mat_dict):
+        return math.hypot(x, y)
+
+    def convert_xy_to_r_vec(self, xy):
         """!
-        Remove materials in the BU file that have an atom density less than the user-defined limit
+        Calculate the radius of the RZ system for an (N,2) array of XY coordinates in a single vectorized call.
         """
-        pruned_mat_dict = {}
-        for isotope, a_dens in mat_dict.items():
-            if a_dens > self.atom_density_limit:
-                pruned_mat_dict[isotope] = a_dens
-        return pruned_mat_dict 
\ No newline at end of file
+        xy = np.asarray(xy, dtype=np.float64)
+        return np.hypot(xy[:, 0], xy[:, 1])
@@ -5,8 +5,9 @@ Copyright 2024, Battelle Energy Alliance, LLC, ALL RIGHTS RESERVED
 '''
 
 import kugelpy.kugelpy.kugelpy.pebble as pebble
-from kugelpy.kugelpy.mutineer.testutils import gen_tmp_folder
+from kugelpy.kugelpy.mutineer.testutils import gen_tmp_folder, slot_vars
 from os import path
+import pickle
 
 main_dir = path.dirname(path.realpath(__file__))
 ifiles_dir = path.join(main_dir, 'testfiles')
@@ -15,41 +16,47 @@ gen_tmp_folder(main_tests_dir)
 
 def test_init(regtest):
     peb = pebble.Pebble(111,111,111,111,111,4,5,temperature=600,pass_limit=5,pebble_number=12345)
-    print(vars(peb), file=regtest)
+    print(slot_vars(peb), file=regtest)
 
 def test_update_position(regtest):
     peb = pebble.Pebble(1,1,1,1,1,1,2,temperature=600,pass_limit=5,pebble_number=12345)
     peb.update_position(111,111,111,111,4,5,shuffled=True)
-    print(vars(peb), file=regtest)
+    print(slot_vars(peb), file=regtest)
 
 def test_increase_pass(regtest):
     peb = pebble.Pebble(1,1,1,1,1,1,2,temperature=600,pass_limit=5,pebble_number=12345)
     peb.increase_pass()
-    print(vars(peb), file=regtest)
+    print(slot_vars(peb), file=regtest)
 
 def test_update_pebble_temperature(regtest):
     peb = pebble.Pebble(1,1,1,1,1,1,2,temperature=600,pass_limit=5,pebble_number=12345)
     peb.update_pebble_temperature(547,fuel_temp=900)
-    print(vars(peb), file=regtest)
+    print(slot_vars(peb), file=regtest)
 
 def test_FuelPebble_init(regtest):
     peb = pebble.FuelPebble(111,111,111,111,111,4,5,temperature=600,fuel_temperature=576, pass_limit=5,pebble_number=12345)
-    print(vars(peb), file=regtest)
+    print(slot_vars(peb), file=regtest)
 
 def test_update_fuel_material(regtest):
     peb = pebble.FuelPebble(111,111,111,111,111,4,5,temperature=600,fuel_temperature=576, pass_limit=5,pebble_number=12345)
     peb.update_fuel_material({'fractions': {'1001': 1.0}})
-    print(vars(peb), file=regtest)
+    print(slot_vars(peb), file=regtest)
+
+def test_update_fuel_material_after_reload():
+    pebbles = pickle.loads(pickle.dumps([pebble.FuelPebble(1,2,3,4,3,0,1), pebble.FuelPebble(5,6,7,8,3,1,2)]))
+    pebbles[0].update_fuel_material({'92235': 1E-3})
+    assert pebbles[1]._material['fuel'] == pebble.FuelPebble._DEFAULT_MATERIAL['fuel']
+    assert pebble.FuelPebble._DEFAULT_MATERIAL['fuel'] != {'92235': 1E-3}
 
 def test_update_burnup(regtest):
     peb = pebble.FuelPebble(111,111,111,111,111,4,5,temperature=600,fuel_temperature=576, pass_limit=5,pebble_number=12345)
     peb.update_burnup(20, 5)
-    print(vars(peb), file=regtest)
+    print(slot_vars(peb), file=regtest)
 
 def test_update_pebble_temperature(regtest):
     peb = pebble.FuelPebble(111,111,111,111,111,4,5,temperature=600,fuel_temperature=576, pass_limit=5,pebble_number=12345)
     peb.update_pebble_temperature(547,fuel_temp=900)
-    print(vars(peb), file=regtest)
+    print(slot_vars(peb), file=regtest)
 
 def test_calculate_volumes(regtest):
     peb = pebble.Pebble(111,111,111,111,3,4,5)
@@ -58,4 +65,38 @@ def test_calculate_volumes(regtest):
     
     fpeb = pebble.FuelPebble(111,111,111,111,3,4,5)
     fpeb.calculate_volumes()
-    print(fpeb._geometry, file=regtest)    
+    print(fpeb._geometry, file=regtest)
+
+def test_update_pebble_temperature_same_bin(regtest, monkeypatch):
+    peb = pebble.FuelPebble(111,111,111,111,111,4,5,temperature=600,fuel_temperature=576, pass_limit=5,pebble_number=12345)
+    binned = []
+    bin_temperature = pebble.FuelPebble._bin_temperature
+    monkeypatch.setattr(pebble.FuelPebble, '_bin_temperature', classmethod(lambda cls, temp: binned.append(temp) or bin_temperature(temp)))
+    # 950 K and 1100 K share the 900 K bin, so only the pebble temperature is looked up
+    peb.update_pebble_temperature(950,fuel_temp=1100)
+    print(peb.xs_library, peb.scattering_library, peb.xs_fuel_library, peb.fuel_scattering_library, file=regtest)
+    assert binned == [950]
+    peb.update_pebble_temperature(950,fuel_temp=1200)
+    assert binned == [950, 950, 1200]
+    assert (peb.xs_library, peb.xs_fuel_library) == ('09c', '12c')
+
+def test_pebble_from_arrays(regtest):
+    pebbles = pebble.Pebble.from_arrays([1,5], [2,6], [3,7], [4,8], 3, [0,1], [1,2], temperature=[600,950], pebble_number=[11,12])
+    for peb, ref in zip(pebbles, [pebble.Pebble(1,2,3,4,3,0,1,temperature=600,pebble_number=11), pebble.Pebble(5,6,7,8,3,1,2,temperature=950,pebble_number=12)]):
+        assert slot_vars(peb) == slot_vars(ref)
+        print(slot_vars(peb), file=regtest)
+
+def test_load_baseline_pickle(regtest):
+    # Pebbles pickled (protocol 2, as `SerpentReactor.save()` wrote them) before pebbles were slotted
+    with open(path.join(ifiles_dir, 'baseline_pebbles.pkl'), 'rb') as f:
+        pebbles = pickle.load(f)
+    refs = [pebble.Pebble(1,2,3,4,3,0,1,temperature=600,pebble_number=11),
+            pebble.FuelPebble(5,6,7,8,3,1,2,temperature=950,fuel_temperature=1250,pebble_number=12),
+            pebble.FuelPebble(5,6,7,8,3,1,2,pebble_number=13)]
+    refs[1].update_burnup(1500, 3)
+    for peb, ref in zip(pebbles, refs):
+        assert {**slot_vars(peb), '_material': None} == {**slot_vars(ref), '_material': None}
+        assert peb._material == ref._material
+        print(slot_vars(peb), file=regtest)
+    pebbles[1].update_fuel_material({'92235': 1E-3})
+    assert pebbles[2]._material['fuel'] == pebble.FuelPebble._DEFAULT_MATERIAL['fuel']
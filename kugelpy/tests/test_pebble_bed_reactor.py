@@ -5,7 +5,9 @@ Copyright 2024, Battelle Energy Alliance, LLC, ALL RIGHTS RESERVED
 '''
 
 import kugelpy.kugelpy.kugelpy.pebble_bed_reactor as pbr
-from os import remove, path
+from os import remove, path, listdir
+import numpy as np
+import pytest
 from kugelpy.kugelpy.mutineer.testutils import gen_tmp_folder
 
 #===============================================================================
@@ -49,6 +51,10 @@ def test_build_cylinder_surface(regtest):
     print(cyly, file=regtest)
     cylx = pbr_instance.build_cylinder_surface('surf_1', 'cylx', 40, x_offset=10, y_offset=2, z_offset=5)
     print(cylx, file=regtest)
+    try:
+        pbr_instance.build_cylinder_surface('surf_1', 'cylq', 40)
+    except ValueError as error:
+        print(error, file=regtest)
 
 def test_build_conus(regtest):
     pbr_instance = pbr.PebbleBedReactor()
@@ -120,6 +126,18 @@ def test_convert_theta_to_uv(regtest):
     theta = pbr_instance.convert_theta_to_uv(0.0, r=50)
     print(theta, file=regtest)
 
+def test_convert_thetas_to_uv(regtest):
+    pbr_instance = pbr.PebbleBedReactor()
+    thetas = np.linspace(0.0, np.pi, 3)
+    uv = pbr_instance.convert_thetas_to_uv(thetas, r=50)
+    assert np.allclose(uv, [pbr_instance.convert_theta_to_uv(theta, r=50) for theta in thetas.tolist()])
+    print(uv.shape, file=regtest)
+
+def test_convert_xy_to_r(regtest):
+    pbr_instance = pbr.PebbleBedReactor()
+    print(pbr_instance.convert_xy_to_r(3.0, 4.0), file=regtest)
+    print(pbr_instance.convert_xy_to_r_vec([[3.0, 4.0], [-5.0, 12.0], [0.0, 0.0]]).tolist(), file=regtest)
+
 def test_build_block_surfaces(regtest):
     pbr_instance = pbr.PebbleBedReactor()
     surf = pbr_instance.build_block_surface(1, 2, 4, 0, 30, x_offset=1.0, y_offset=12.0)
@@ -143,6 +161,7 @@ def test_build_block_cell(regtest):
 def test_build_dimple_cells(regtest):
     pbr_instance = pbr.PebbleBedReactor()
     dimple = pbr_instance.build_dimple_cells('test', 1)
+    assert pbr_instance.build_dimple_cells('test', num=1) == dimple
     print(dimple, file=regtest)
 
 def test_build_rod_cells(regtest):
@@ -158,6 +177,7 @@ def test_block_universe(regtest):
 def test_build_dimple_universes(regtest):
     pbr_instance = pbr.PebbleBedReactor()
     dimple_cells =  pbr_instance.build_dimple_universes('test', 1)
+    assert pbr_instance.build_dimple_universes('test', num=1) == dimple_cells
     print(dimple_cells, file=regtest)
 
 def test_build_rod_universe(regtest):
@@ -185,3 +205,108 @@ def test_build_pbr_core_simple(regtest):
     pbr_instance.write_pbr_core()
     file_ = open(path.join(main_tests_dir, 'pbr_structure.inp'), 'r')
     print([x for x in file_], file=regtest)    
+
+def test_build_pbr_core_stream(regtest):
+    pbr_instance = pbr.PebbleBedReactor(output_dir=main_tests_dir)
+    pbr_instance.build_pbr_core()
+    pbr_instance.write_pbr_core()
+    with open(path.join(main_tests_dir, 'pbr_structure.inp'), 'r') as file_:
+        core_input = file_.read()
+    stream_instance = pbr.PebbleBedReactor(output_dir=main_tests_dir, core_file_name='pbr_structure_stream.inp')
+    with open(path.join(main_tests_dir, 'pbr_structure_stream.inp'), 'w') as out:
+        stream_instance.build_pbr_core(out=out)
+    with open(path.join(main_tests_dir, 'pbr_structure_stream.inp'), 'r') as file_:
+        assert file_.read() == core_input
+    print(stream_instance._block_dict, stream_instance._reactor_dict, file=regtest)
+    # Streaming leaves geometry built earlier on the same reactor in place
+    reactor_dict = pbr_instance._reactor_dict
+    with open(path.join(main_tests_dir, 'pbr_structure_stream.inp'), 'w') as out:
+        pbr_instance.build_pbr_core(out=out)
+    assert pbr_instance._reactor_dict == reactor_dict
+    pbr_instance.write_pbr_core()
+    with open(path.join(main_tests_dir, 'pbr_structure.inp'), 'r') as file_:
+        assert file_.read() == core_input
+
+def test_render_pbr_core(regtest):
+    pbr_instance = pbr.PebbleBedReactor(output_dir=main_tests_dir, cr_insertion_depth=150.0, sr_insertion_depth=40.0)
+    pbr_instance.build_pbr_core()
+    pbr_instance.write_pbr_core()
+    with open(path.join(main_tests_dir, 'pbr_structure.inp'), 'r') as file_:
+        core_input = file_.read()
+    template_instance = pbr.PebbleBedReactor()
+    template_instance.build_core_template()
+    assert template_instance.render_pbr_core(cr_insertion_depth=150.0, sr_insertion_depth=40.0) == core_input
+    print(template_instance.render_pbr_core(cr_insertion_depth=0.0).count('_cr_s cylz'), file=regtest)
+    # Rendering leaves an already built core in place and follows later geometry changes
+    pbr_instance.render_pbr_core(cr_insertion_depth=150.0)
+    pbr_instance.write_pbr_core()
+    with open(path.join(main_tests_dir, 'pbr_structure.inp'), 'r') as file_:
+        assert file_.read() == core_input
+    template_instance.block_inner_radius = 110.0
+    assert template_instance.render_pbr_core(cr_insertion_depth=150.0) != core_input
+    template_instance.block_inner_radius = 120.0
+    assert template_instance.render_pbr_core(cr_insertion_depth=150.0) == core_input
+
+def test_save_loader(regtest):
+    temp_path = path.join(main_tests_dir, 'test_save_loader')
+    gen_tmp_folder(temp_path)
+    pbr_instance = pbr.PebbleBedReactor(output_dir=temp_path)
+    pbr_instance.build_pbr_core()
+    pbr_instance.keff = np.linspace(1.0, 1.1, 5)
+    pbr_instance.save(3)
+    loaded = pbr.PebbleBedReactor.loader(temp_path, 3)
+    loaded.keff[0] = 0.9
+    print(loaded.keff.tolist(), loaded._reactor_dict == pbr_instance._reactor_dict, file=regtest)
+    # Without array data no side file is written
+    pbr_instance.keff = [1.0, 1.1]
+    pbr_instance.save(3)
+    assert not path.isfile(path.join(temp_path, 'savepoint_step3.pkl.buffers'))
+    assert pbr.PebbleBedReactor.loader(temp_path, 3).keff == [1.0, 1.1]
+    # A side file left over from another save is not paired with the new pickle
+    pbr_instance.keff = np.linspace(1.0, 1.1, 5)
+    pbr_instance.save(3)
+    buffers_file = path.join(temp_path, 'savepoint_step3.pkl.buffers')
+    with open(buffers_file, 'rb') as file_:
+        stale = file_.read()
+    pbr_instance.keff = [1.0, 1.1]
+    pbr_instance.save(3)
+    with open(buffers_file, 'wb') as file_:
+        file_.write(stale)
+    assert pbr.PebbleBedReactor.loader(temp_path, 3).keff == [1.0, 1.1]
+    pbr_instance.keff = np.linspace(1.0, 1.2, 5)
+    pbr_instance.save(3)
+    with open(buffers_file, 'wb') as file_:
+        file_.write(stale)
+    with pytest.raises(ValueError):
+        pbr.PebbleBedReactor.loader(temp_path, 3)
+    assert sorted(listdir(temp_path)) == ['savepoint_step3.pkl', 'savepoint_step3.pkl.buffers']
+
+def test_keep_solutions(regtest):
+    temp_path = path.join(main_tests_dir, 'test_keep_solutions')
+    gen_tmp_folder(temp_path)
+    for file_name in ['reactor', 'reactor_res.m', 'reactor_status.csv', 'run_des.pbs']:
+        with open(path.join(temp_path, file_name), 'w') as file_:
+            file_.write(file_name)
+    pbr_instance = pbr.PebbleBedReactor(output_dir=temp_path)
+    pbr_instance.keep_solutions(1)
+    print(sorted(listdir(temp_path)), sorted(listdir(path.join(temp_path, 'step_1'))), file=regtest)
+
+def test_create_user_detector(regtest):
+    pbr_instance = pbr.PebbleBedReactor()
+    cyl = {'r': [0.0, 120.0, 4], 'theta': [0.0, 360.0, 1], 'z': [0.0, 900.0, 3]}
+    for name in ['flux_a', 'flux_b']:
+        pbr_instance.create_user_detector(name, energy_bins='grid', axial_variation=[0.0, 900.0, 3], cylindrical_variation=cyl, materials=['fuel'], responses=['-8'])
+    assert pbr_instance.user_detector_dict['flux_a']['detector']['cylindrical_variation'] is cyl
+    for name, detector in pbr_instance.user_detector_dict.items():
+        print(detector['detector_str'], file=regtest)
+
+def test_set_reactor_dict(regtest):
+    pbr_instance = pbr.PebbleBedReactor()
+    pbr_instance.build_conus()
+    pbr_instance.build_cavity()
+    reactor_dict = pbr_instance._reactor_dict
+    reactor_dict['cavity']['cells'] = 'cell cavity_c cavity_u void -cavity_s\n'
+    reactor_dict['extra'] = {'surface': 'surf extra_s sph 0 0 0 1\n'}
+    pbr_instance._reactor_dict = reactor_dict
+    assert pbr_instance._reactor_dict == reactor_dict
+    print(pbr_instance._reactor_parts, file=regtest)
@@ -7,6 +7,7 @@ Copyright 2024, Battelle Energy Alliance, LLC, ALL RIGHTS RESERVED
 import os
 from os import path
 import shutil
+import numpy as np
 import kugelpy.kugelpy.kugelpy.pebble_sorter as psp
 import copy
 from kugelpy.kugelpy.mutineer.testutils import gen_tmp_folder, find_pbed_input, compare_pbeds
@@ -319,6 +320,23 @@ def test_read_burn_material(regtest):
     ps.read_burn_material()
     print(ps._burnup_materials, file=regtest)
 
+def test_prune_burn_material(regtest):
+    ps = psp.PebbleSorter(output_dir=main_tests_dir)
+    mat_dict = {'volume': 1.5, '92235': 1E-3, '54135': 1E-21, '1001': 0.0, '94239': 2E-20}
+    print(ps.prune_burn_material(mat_dict), file=regtest)
+    nuclides, a_dens = ps.prune_burn_arrays(list(mat_dict.keys()), list(mat_dict.values()))
+    print(nuclides.tolist(), a_dens.tolist(), file=regtest)
+    mat_arrays = {'volume': 1.5, 'nuclides': np.array(list(mat_dict.keys())[1:]), 'a_dens': np.array(list(mat_dict.values())[1:])}
+    assert ps.prune_burn_material_arrays(mat_arrays) == ps.prune_burn_material(mat_dict)
+
+def test_combine_dicts(regtest):
+    ps = psp.PebbleSorter(output_dir=main_tests_dir)
+    a = {'92235': 1.0, '92238': 2.0, '8016': 4.0}
+    b = {'8016': 0.5, '94239': 3.0, '92235': 0.25}
+    print(ps.combine_dicts(a, b), file=regtest)
+    nuclides, a_dens = ps.combine_burn_arrays(list(a.keys()), list(a.values()), list(b.keys()), list(b.values()))
+    print(nuclides.tolist(), a_dens.tolist(), file=regtest)
+
 def test_read_in_pebble_dist(regtest):
 
     ps = psp.PebbleSorter(graphite_height=12.50,
@@ -363,7 +381,6 @@ def test_shift_pebbles(regtest):
                                      'f0_c0v0': {'92234':  4, 'volume': 1},
                                      'f0_c0v1': {'92234':  5, 'volume': 1},}}
     ps.read_volume_powers()
-    ps._pebble_array[0][1][-1].homogenization_group = 1
     ps.shift_pebbles()
     print(pebble_order == [pebble._pebble_type for pebble in ps._pebble_array[0][1]], file=regtest)    
     print(len(ps._unloaded_pebbles) , file=regtest)
@@ -650,3 +667,10 @@ def test_refuel_pebbles_homogenize3(regtest):
     print('*****************************************************************************************************************************************************************************')   
     print(f'Pebble Num: {pebble._pebble_number}, Pass Num: {pebble._num_passes}, BU Num: {round(pebble._burnup,5)}, Power Days: {power} Universe: {pebble._universe}, \nMaterial: {fuel}')
     print('*****************************************************************************************************************************************************************************')
+
+def test_set_random_seed():
+    ps = psp.PebbleSorter()
+    ps.set_random_seed(2)
+    first = ps.rng.uniform(size=5)
+    ps.set_random_seed(2)
+    assert (ps.rng.uniform(size=5) == first).all()